@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -48,10 +50,11 @@ def _parse_env_from_compose(path: Path) -> dict[str, str]:
     return env_vars
 
 
-_compose_env = _parse_env_from_compose(_COMPOSE_FILE)
-for _k, _v in _compose_env.items():
-    if _k not in os.environ:
-        os.environ[_k] = _v
+def _apply_compose_env() -> None:
+    """Copy compose-file variables into os.environ without overriding."""
+    for key, value in _parse_env_from_compose(_COMPOSE_FILE).items():
+        if key not in os.environ:
+            os.environ[key] = value
 
 
 class Settings(BaseSettings):
@@ -84,6 +87,8 @@ class Settings(BaseSettings):
     ai_moderation_model: str = Field(
         default="openai/gpt-4o-mini", alias="AI_MODERATION_MODEL"
     )
+    # How long identical assistant questions are answered from memory (0 = off)
+    ai_reply_cache_ttl_sec: int = Field(default=3600, alias="AI_REPLY_CACHE_TTL_SEC")
 
     # Database
     database_url: str = Field(
@@ -106,4 +111,23 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings instance, built on first use.
+
+    Reading docker-compose.yaml / .env and running pydantic validation is
+    deferred until something actually needs a setting.
+    """
+    _apply_compose_env()
+    return Settings()
+
+
+if TYPE_CHECKING:
+    settings: Settings
+
+
+def __getattr__(name: str) -> Settings:
+    # ``from app.config import settings`` resolves through here (PEP 562).
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,28 +9,33 @@ Fixes applied:
 from __future__ import annotations
 
 import logging
-import re
-from typing import TYPE_CHECKING
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 from aiogram import Bot, F, Router
-from aiogram.dispatcher.event.bases import SkipHandler
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.config import settings
-from app.services.ai_module import OpenRouterProvider
+from app.services.ai_module import (
+    _bot_name_pattern,
+    get_ai_provider,
+    reload_profanity_dicts,
+)
+from app.services.rag import load_rag_from_telegram
 from app.utils.admin import is_admin
 
 if TYPE_CHECKING:
-    pass
+    import re
 
 router = Router(name="help")
 logger = logging.getLogger(__name__)
 
-_ai = OpenRouterProvider()
+_ai = get_ai_provider()
 
 # Bot name variants the assistant responds to
-_BOT_NAMES = ["alexbot", "алексбот", "алекс бот", "бот"]
+_BOT_NAMES: tuple[str, ...] = ("alexbot", "алексбот", "алекс бот", "бот")
+_BOT_NAMES_RE = _bot_name_pattern(_BOT_NAMES)
 
 
 def _is_bot_name_called(text: str, bot_names: list[str] | None = None) -> bool:
@@ -42,27 +47,24 @@ def _is_bot_name_called(text: str, bot_names: list[str] | None = None) -> bool:
     regex word character. The lookbehind/lookahead therefore never matched.
 
     Correct fix: build the boundary pattern from a plain raw string:
-        r"(?<![\w])" + ... + r"(?![\w])"
+        r"(?<![\\w])" + ... + r"(?![\\w])"
+    All names are joined into one alternation compiled once per name list.
     """
-    names = bot_names if bot_names is not None else _BOT_NAMES
-    text_lower = text.lower()
-    for name in names:
-        # Correct word-boundary pattern (Task 3 fix)
-        pattern = r"(?<![\w])" + re.escape(name.casefold()) + r"(?![\w])"
-        if re.search(pattern, text_lower):
-            return True
-    return False
+    if bot_names is None:
+        return _BOT_NAMES_RE.search(text) is not None
+    if not bot_names:
+        return False
+    return _bot_name_pattern(tuple(bot_names)).search(text) is not None
 
 
-@router.message(Command("help"))
-async def cmd_help(message: Message) -> None:
-    """Show help menu with links to forum topics."""
-    forum_id = settings.forum_chat_id
+@lru_cache(maxsize=1)
+def _help_text() -> str:
+    """Build the /help message once; it only depends on settings."""
     # Build numeric prefix for t.me/c/ links (strips -100 prefix)
-    cid = str(abs(forum_id))
+    cid = str(abs(settings.forum_chat_id))
     num = cid[3:] if cid.startswith("100") else cid
 
-    text = (
+    return (
         "📖 <b>Добро пожаловать в AlexBot!</b>\n\n"
         "Я помогу с вопросами о ЖК:\n"
         "• <b>Шлагбаум</b> — правила въезда\n"
@@ -72,37 +74,47 @@ async def cmd_help(message: Message) -> None:
         f"🔗 <a href='https://t.me/c/{num}/{settings.topic_rules}'>Правила чата</a>\n"
         f"🔗 <a href='https://t.me/c/{num}/{settings.topic_gate}'>Шлагбаум</a>"
     )
-    await message.reply(text, parse_mode="HTML")
 
 
-@router.message(F.text)
-async def handle_mention(message: Message, bot: Bot) -> None:
-    """Respond when the bot is mentioned by name in a message."""
-    if not message.text:
-        raise SkipHandler
+@router.message(Command("help"))
+async def cmd_help(message: Message) -> None:
+    """Show help menu with links to forum topics."""
+    await message.reply(_help_text(), parse_mode="HTML")
+
+
+async def _bot_mentioned(message: Message, bot: Bot) -> bool | dict[str, Any]:
+    """Router filter: match only forum messages that mention the bot by name.
+
+    On a match the compiled name pattern is handed to the handler as
+    ``bot_name_pattern``, so unrelated messages never enter the handler.
+    """
+    text = message.text
+    if not text:
+        return False
 
     # Only respond in the forum
     if message.chat.id != settings.forum_chat_id:
-        raise SkipHandler
+        return False
 
-    bot_info = await bot.get_me()
-    names = _BOT_NAMES.copy()
+    # Bot.me() caches the getMe result on the bot instance
+    bot_info = await bot.me()
+    names = _BOT_NAMES
     if bot_info.username:
-        names.append(bot_info.username.lower())
+        names = (*names, bot_info.username)
+    pattern = _bot_name_pattern(names)
 
-    if not _is_bot_name_called(message.text, names):
-        raise SkipHandler
+    if pattern.search(text) is None:
+        return False
 
+    # The handler reuses the pattern to strip the name from the prompt
+    return {"bot_name_pattern": pattern}
+
+
+@router.message(F.text, _bot_mentioned)
+async def handle_mention(message: Message, bot_name_pattern: re.Pattern[str]) -> None:
+    """Respond when the bot is mentioned by name in a message."""
     # Strip the bot name from the prompt
-    prompt = message.text
-    for name in names:
-        prompt = re.sub(
-            r"(?<![\w])" + re.escape(name) + r"(?![\w])",
-            "",
-            prompt,
-            flags=re.IGNORECASE,
-        )
-    prompt = prompt.strip(" ,!?")
+    prompt = bot_name_pattern.sub("", message.text).strip(" ,!?")
 
     # Extract display name for personalized replies
     user = message.from_user
@@ -122,7 +134,6 @@ async def handle_mention(message: Message, bot: Bot) -> None:
 async def cmd_reload_profanity(message: Message, bot: Bot) -> None:
     if not await is_admin(bot, settings.forum_chat_id, message.from_user.id):
         return
-    from app.services.ai_module import reload_profanity_dicts
     count = reload_profanity_dicts()
     await message.reply(f"✅ Словарь мата перезагружен: {count} корней.")
 
@@ -131,6 +142,5 @@ async def cmd_reload_profanity(message: Message, bot: Bot) -> None:
 async def cmd_update_rag(message: Message, bot: Bot) -> None:
     if not await is_admin(bot, settings.forum_chat_id, message.from_user.id):
         return
-    from app.services.rag import load_rag_from_telegram
     count = await load_rag_from_telegram(bot)
     await message.reply(f"✅ RAG обновлён: {count} фрагментов загружено.")
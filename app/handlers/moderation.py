@@ -7,15 +7,29 @@ from datetime import timedelta
 
 from aiogram import Bot, Router
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import ChatPermissions, Message
 
 from app.config import settings
 from app.services.moderation import run_moderation
-from app.utils.admin import invalidate_admin_cache, is_admin
+from app.utils.admin import get_admin_ids, invalidate_admin_cache, is_admin
 
 router = Router(name="moderation")
 logger = logging.getLogger(__name__)
 
+# Permissions applied by /mute — built once, reused for every call
+_SILENT_PERMISSIONS = ChatPermissions(
+    can_send_messages=False,
+    can_send_audios=False,
+    can_send_documents=False,
+    can_send_photos=False,
+    can_send_videos=False,
+    can_send_video_notes=False,
+    can_send_voice_notes=False,
+    can_send_polls=False,
+    can_send_other_messages=False,
+    can_add_web_page_previews=False,
+)
+
 
 @router.message(Command("mute"))
 async def cmd_mute(message: Message, bot: Bot) -> None:
@@ -29,7 +43,7 @@ async def cmd_mute(message: Message, bot: Bot) -> None:
     await bot.restrict_chat_member(
         settings.forum_chat_id,
         target_id,
-        permissions=_silent_permissions(),
+        permissions=_SILENT_PERMISSIONS,
         until_date=timedelta(hours=1),
     )
     invalidate_admin_cache(settings.forum_chat_id, target_id)
@@ -74,24 +88,9 @@ async def moderate_incoming(message: Message, bot: Bot) -> None:
     if not user_id:
         return
 
-    # Skip moderation for admins
-    if await is_admin(bot, settings.forum_chat_id, user_id):
+    # Skip moderation for admins (one cached admin set per chat)
+    if user_id in await get_admin_ids(bot, settings.forum_chat_id):
         return
 
     await run_moderation(message, bot, settings.forum_chat_id)
 
-
-def _silent_permissions():
-    from aiogram.types import ChatPermissions
-    return ChatPermissions(
-        can_send_messages=False,
-        can_send_audios=False,
-        can_send_documents=False,
-        can_send_photos=False,
-        can_send_videos=False,
-        can_send_video_notes=False,
-        can_send_voice_notes=False,
-        can_send_polls=False,
-        can_send_other_messages=False,
-        can_add_web_page_previews=False,
-    )
@@ -11,6 +11,8 @@ from __future__ import annotations
 import asyncio
 import logging
 from datetime import datetime, timezone
+from heapq import nlargest
+from operator import itemgetter
 from typing import Optional
 
 from aiogram import Bot, F, Router
@@ -19,18 +21,23 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.config import settings
-from app.models.base import get_session
+from app.models.base import session_scope
 from app.services.quiz import (
     QUIZ_BREAK_BETWEEN_QUESTIONS_SEC,
     QUIZ_QUESTION_TIMEOUT_SEC,
     QUIZ_TOTAL_QUESTIONS,
     build_answer_hint,
     cancel_all_timers,
+    claim_correct_answer,
     end_quiz_session,
+    forget_current_question,
     get_active_session,
+    get_current_question,
     get_next_question,
     local_quiz_answer_decision,
     mark_question_used,
+    remember_current_question,
+    release_correct_answer,
     reset_used_questions,
     safe_finish_quiz,
     schedule_grace,
@@ -42,6 +49,9 @@ from app.utils.admin import is_admin
 router = Router(name="quiz")
 logger = logging.getLogger(__name__)
 
+# Number of players shown in the final scoreboard
+LEADERBOARD_SIZE = 10
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -51,15 +61,16 @@ async def _send_question(
     bot: Bot,
     chat_id: int,
     topic_id: int,
-    quiz_session,
 ) -> None:
     """Fetch next question, send it, and start timeout timer."""
-    async for session in get_session():
-        # Re-attach the detached quiz_session to this DB session so that
-        # changes (current_question_id, questions_asked, etc.) are persisted.
-        quiz_session = await session.merge(quiz_session)
-        used_ids = quiz_session.get_used_ids()
-        question = await get_next_question(session, chat_id, used_ids)
+    async with session_scope() as session:
+        # Reload rather than merge a caller's detached copy: its changes are
+        # already committed, and a quiz stopped during the break must not be
+        # brought back by merging a stale is_active=True over it.
+        quiz_session = await get_active_session(session, chat_id, topic_id)
+        if quiz_session is None:
+            return
+        question = await get_next_question(session, chat_id)
         if question is None:
             # No more questions
             await safe_finish_quiz(
@@ -67,12 +78,14 @@ async def _send_question(
             )
             return
 
-        quiz_session.current_question_id = question.id
+        quiz_session.current_question = question
         quiz_session.question_started_at = datetime.now(timezone.utc)
-        quiz_session.add_used_id(question.id)
+        if question.id not in quiz_session.used_question_ids:
+            quiz_session.used_question_ids.append(question.id)
         quiz_session.questions_asked += 1
-        await mark_question_used(session, chat_id, question.id)
+        mark_question_used(session, chat_id, question.id)
         await session.commit()
+        remember_current_question(chat_id, topic_id, question.id, question.answer)
 
         hint = build_answer_hint(question.answer)
         await bot.send_message(
@@ -84,31 +97,44 @@ async def _send_question(
             message_thread_id=topic_id,
         )
 
-        question_started_at = quiz_session.question_started_at
-
-        async def _timeout_handler() -> None:
-            await asyncio.sleep(QUIZ_QUESTION_TIMEOUT_SEC)
-            async for s in get_session():
-                qs = await get_active_session(s, chat_id, topic_id)
-                if not qs:
-                    return
-                # Check this is still the same question
-                if qs.question_started_at != question_started_at:
-                    return
-                await bot.send_message(
-                    chat_id,
-                    f"⏰ Время вышло! Правильный ответ: <b>{question.answer}</b>",
-                    parse_mode="HTML",
-                    message_thread_id=topic_id,
-                )
-                if qs.questions_asked >= QUIZ_TOTAL_QUESTIONS:
-                    await safe_finish_quiz(s, bot, chat_id, topic_id, qs, _notify_results)
-                else:
-                    await asyncio.sleep(QUIZ_BREAK_BETWEEN_QUESTIONS_SEC)
-                    await _send_question(bot, chat_id, topic_id, qs)
+        # The timer only keeps the id and answer text, not the ORM objects
+        schedule_timeout(
+            chat_id,
+            topic_id,
+            _question_timeout(bot, chat_id, topic_id, question.id, question.answer),
+        )
 
-        schedule_timeout(chat_id, topic_id, _timeout_handler())
-        break
+
+async def _question_timeout(
+    bot: Bot,
+    chat_id: int,
+    topic_id: int,
+    question_id: int,
+    answer: str,
+) -> None:
+    """Reveal the answer if *question_id* is still unanswered after the timeout."""
+    await asyncio.sleep(QUIZ_QUESTION_TIMEOUT_SEC)
+    async with session_scope() as session:
+        quiz_session = await get_active_session(session, chat_id, topic_id)
+        if not quiz_session:
+            return
+        # Check this is still the same question
+        if quiz_session.current_question_id != question_id:
+            return
+        forget_current_question(chat_id, topic_id)
+        await bot.send_message(
+            chat_id,
+            f"⏰ Время вышло! Правильный ответ: <b>{answer}</b>",
+            parse_mode="HTML",
+            message_thread_id=topic_id,
+        )
+        if quiz_session.questions_asked >= QUIZ_TOTAL_QUESTIONS:
+            await safe_finish_quiz(
+                session, bot, chat_id, topic_id, quiz_session, _notify_results
+            )
+        else:
+            await asyncio.sleep(QUIZ_BREAK_BETWEEN_QUESTIONS_SEC)
+            await _send_question(bot, chat_id, topic_id)
 
 
 async def _notify_results(
@@ -118,14 +144,15 @@ async def _notify_results(
     quiz_session,
 ) -> None:
     """Send final scoreboard message."""
-    scores = quiz_session.get_scores()
+    scores = quiz_session.scores
     if not scores:
         text = "🏁 Викторина завершена! Никто не ответил правильно 😢"
     else:
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        top = nlargest(LEADERBOARD_SIZE, scores.items(), key=itemgetter(1))
         lines = ["🏆 <b>Результаты викторины:</b>"]
-        for rank, (user_id, pts) in enumerate(sorted_scores, 1):
-            lines.append(f"{rank}. user_{user_id}: {pts} очк.")
+        lines.extend(
+            f"{rank}. user_{user_id}: {pts} очк." for rank, (user_id, pts) in enumerate(top, 1)
+        )
         text = "\n".join(lines)
     await bot.send_message(
         chat_id,
@@ -149,7 +176,7 @@ async def cmd_start_quiz(message: Message, bot: Bot) -> None:
 
     topic_id = message.message_thread_id or settings.topic_games
 
-    async for session in get_session():
+    async with session_scope() as session:
         existing = await get_active_session(session, settings.forum_chat_id, topic_id)
         if existing:
             await message.reply("Викторина уже идёт!")
@@ -158,7 +185,7 @@ async def cmd_start_quiz(message: Message, bot: Bot) -> None:
         await session.commit()
 
     await message.reply("🎮 Викторина начинается! Приготовьтесь...")
-    await _send_question(bot, settings.forum_chat_id, topic_id, quiz_session)
+    await _send_question(bot, settings.forum_chat_id, topic_id)
 
 
 @router.message(Command("stopquiz"))
@@ -173,7 +200,7 @@ async def cmd_stop_quiz(message: Message, bot: Bot) -> None:
     topic_id = message.message_thread_id or settings.topic_games
     cancel_all_timers(settings.forum_chat_id, topic_id)
 
-    async for session in get_session():
+    async with session_scope() as session:
         quiz_session = await get_active_session(session, settings.forum_chat_id, topic_id)
         if not quiz_session:
             await message.reply("Нет активной викторины.")
@@ -181,7 +208,6 @@ async def cmd_stop_quiz(message: Message, bot: Bot) -> None:
         await safe_finish_quiz(
             session, bot, settings.forum_chat_id, topic_id, quiz_session, _notify_results
         )
-        break
 
     await message.reply("⏹ Викторина остановлена администратором.")
 
@@ -191,11 +217,10 @@ async def cmd_reset_used(message: Message, bot: Bot) -> None:
     """Admin command to reset the used-questions list. (Task 1 supplement)"""
     if not await is_admin(bot, settings.forum_chat_id, message.from_user.id):
         return
-    async for session in get_session():
+    async with session_scope() as session:
         count = await reset_used_questions(session, settings.forum_chat_id)
         await session.commit()
         await message.reply(f"✅ Сброшено {count} использованных вопросов.")
-        break
 
 
 @router.message(F.text)
@@ -205,44 +230,70 @@ async def handle_quiz_answer(message: Message, bot: Bot) -> None:
         raise SkipHandler
     if not message.text or not message.from_user:
         raise SkipHandler
+    if message.text.startswith("/"):
+        raise SkipHandler  # Commands for other routers are not answers
 
     topic_id = message.message_thread_id or settings.topic_games
     if topic_id != settings.topic_games:
         raise SkipHandler  # Only in games topic
 
-    async for session in get_session():
-        quiz_session = await get_active_session(session, settings.forum_chat_id, topic_id)
-        if not quiz_session or not quiz_session.current_question_id:
-            raise SkipHandler
-
-        # Fetch current question
-        from sqlalchemy import select
-        from app.models.quiz import QuizQuestion
-        result = await session.execute(
-            select(QuizQuestion).where(QuizQuestion.id == quiz_session.current_question_id)
-        )
-        question = result.scalar_one_or_none()
-        if not question:
-            return
+    current = get_current_question(settings.forum_chat_id, topic_id)
+    if current is None:
+        # Cold cache (e.g. after a restart): current_question is joined-loaded
+        async with session_scope() as session:
+            quiz_session = await get_active_session(session, settings.forum_chat_id, topic_id)
+            question = quiz_session.current_question if quiz_session else None
+            if question is None:
+                raise SkipHandler
+            current = remember_current_question(
+                settings.forum_chat_id, topic_id, question.id, question.answer
+            )
+    question_id, answer = current
 
-        decision = local_quiz_answer_decision(question.answer, message.text)
-        if decision.is_correct:
-            cancel_all_timers(settings.forum_chat_id, topic_id)
-            quiz_session.add_score(message.from_user.id)
-            quiz_session.current_question_id = None
+    decision = local_quiz_answer_decision(answer, message.text)
+    if not decision.is_correct:
+        return
+
+    chat_id = settings.forum_chat_id
+    async with session_scope() as session:
+        quiz_session = await get_active_session(session, chat_id, topic_id)
+        if not quiz_session or quiz_session.current_question_id != question_id:
+            return  # Quiz was stopped or moved on in the meantime
+        if not claim_correct_answer(chat_id, topic_id, question_id):
+            return  # Someone else was faster; their point is not committed yet
+
+        try:
+            forget_current_question(chat_id, topic_id)
+            cancel_all_timers(chat_id, topic_id)
+            user_id = message.from_user.id
+            quiz_session.scores[user_id] = quiz_session.scores.get(user_id, 0) + 1
+            quiz_session.current_question = None
 
             suffix = " (почти точно!)" if decision.is_close else ""
             await message.reply(
-                f"✅ Верно{suffix}! Правильный ответ: <b>{question.answer}</b>",
+                f"✅ Верно{suffix}! Правильный ответ: <b>{answer}</b>",
                 parse_mode="HTML",
             )
 
             if quiz_session.questions_asked >= QUIZ_TOTAL_QUESTIONS:
                 await safe_finish_quiz(
-                    session, bot, settings.forum_chat_id, topic_id, quiz_session, _notify_results
+                    session, bot, chat_id, topic_id, quiz_session, _notify_results
                 )
-            else:
-                await session.commit()
-                await asyncio.sleep(QUIZ_BREAK_BETWEEN_QUESTIONS_SEC)
-                await _send_question(bot, settings.forum_chat_id, topic_id, quiz_session)
-        break
+                return
+            # Persist the point before the break so /stopquiz or a restart
+            # during the break still counts it
+            await session.commit()
+        except Exception:
+            # Nothing was committed: reopen the question so the next correct
+            # answer still scores and the timer can move the quiz on
+            release_correct_answer(chat_id, topic_id, question_id)
+            remember_current_question(chat_id, topic_id, question_id, answer)
+            schedule_timeout(
+                chat_id,
+                topic_id,
+                _question_timeout(bot, chat_id, topic_id, question_id, answer),
+            )
+            raise
+
+    await asyncio.sleep(QUIZ_BREAK_BETWEEN_QUESTIONS_SEC)
+    await _send_question(bot, chat_id, topic_id)
@@ -14,6 +14,7 @@ from app.handlers import help as help_handler
 from app.handlers import moderation as moderation_handler
 from app.handlers import quiz as quiz_handler
 from app.middleware.logging_middleware import LoggingMiddleware
+from app.services.ai_module import get_ai_provider
 from app.models.base import init_db
 
 logging.basicConfig(
@@ -42,16 +43,18 @@ async def main() -> None:
 
     dp.message.middleware(LoggingMiddleware())
 
-    # Router registration order matters — quiz before moderation to handle
-    # answer messages first, then moderation catches anything that slips through.
-    dp.include_router(help_handler.router)
+    # Router registration order matters — quiz first so answers in the games
+    # topic are handled without walking the help router, then mentions, then
+    # moderation catches anything that slips through.
     dp.include_router(quiz_handler.router)
+    dp.include_router(help_handler.router)
     dp.include_router(moderation_handler.router)
 
     logger.info("AlexBot starting...")
     try:
         await dp.start_polling(bot, allowed_updates=["message", "callback_query"])
     finally:
+        await get_ai_provider().close()
         await bot.session.close()
 
 
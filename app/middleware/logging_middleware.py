@@ -19,11 +19,16 @@ class LoggingMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        if isinstance(event, Message) and event.text:
+        # Check the level first so the arguments are not built at INFO and above
+        if (
+            isinstance(event, Message)
+            and event.text
+            and logger.isEnabledFor(logging.DEBUG)
+        ):
             logger.debug(
                 "msg chat=%s user=%s text=%r",
-                getattr(event.chat, "id", None),
-                getattr(getattr(event, "from_user", None), "id", None),
+                event.chat.id,
+                event.from_user.id if event.from_user else None,
                 event.text[:80],
             )
         # Always call the handler — do NOT swallow exceptions from it
@@ -1,9 +1,34 @@
-from sqlalchemy.ext.asyncio import AsyncAttrs, create_async_engine, async_sessionmaker
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False)
+# The app issues a small, fixed set of statements; a roomier compiled-SQL
+# cache keeps every variant (incl. joined-eager loads) from being recompiled.
+engine = create_async_engine(settings.database_url, echo=False, query_cache_size=1200)
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        # WAL + synchronous=NORMAL: no fsync per commit, readers never block
+        # the writer. Quiz answers and questions each commit separately.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -11,11 +36,22 @@ class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
-async def get_session():
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """``async with session_scope() as session:`` — one session per unit of work."""
     async with async_session_factory() as session:
         yield session
 
 
+def _create_schema(connection) -> None:
+    Base.metadata.create_all(connection)
+    # create_all() skips tables that already exist, and with them any index
+    # added to the model later; create those on existing databases too.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_db() -> None:
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
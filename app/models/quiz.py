@@ -1,13 +1,55 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
-from typing import Optional
-
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
+from typing import Any, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
 
 from app.models.base import Base
+from app.utils.jsonfast import json_dumps, json_loads
+
+# Telegram chat / topic ids do not fit in 32 bits (supergroups are -100…).
+# SQLite INTEGER is already 64-bit, so keep its native type there.
+TelegramId = BigInteger().with_variant(Integer(), "sqlite")
+
+
+class JSONList(TypeDecorator):
+    """A list stored as JSON text; parsed once on load, dumped once on flush."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[list[Any]], dialect) -> str:
+        return json_dumps(list(value or ()))
+
+    def process_result_value(self, value: Optional[str], dialect) -> list[Any]:
+        return json_loads(value or "[]")
+
+
+class JSONIntKeyDict(TypeDecorator):
+    """A ``dict[int, int]`` stored as JSON text (JSON object keys are strings)."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[dict[int, int]], dialect) -> str:
+        return json_dumps(dict(value or {}))
+
+    def process_result_value(self, value: Optional[str], dialect) -> dict[int, int]:
+        return {int(k): v for k, v in json_loads(value or "{}").items()}
 
 
 class QuizQuestion(Base):
@@ -35,8 +77,8 @@ class QuizSession(Base):
     __tablename__ = "quiz_sessions"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    chat_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
-    topic_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    chat_id: Mapped[int] = mapped_column(TelegramId, nullable=False, index=True)
+    topic_id: Mapped[int] = mapped_column(TelegramId, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     started_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
@@ -48,36 +90,35 @@ class QuizSession(Base):
     question_started_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime, nullable=True
     )
-    used_question_ids_json: Mapped[str] = mapped_column(Text, default="[]")
-    score_json: Mapped[str] = mapped_column(Text, default="{}")
+    # Joined-loaded so answer handling gets the question in the same query.
+    current_question: Mapped[Optional[QuizQuestion]] = relationship(
+        "QuizQuestion", foreign_keys=[current_question_id], lazy="joined"
+    )
+    # Mutable wrappers track in-place changes, so callers just append / assign
+    # and the JSON is serialized once per flush. Column names are unchanged.
+    used_question_ids: Mapped[list[int]] = mapped_column(
+        "used_question_ids_json", MutableList.as_mutable(JSONList), default=list
+    )
+    scores: Mapped[dict[int, int]] = mapped_column(
+        "score_json", MutableDict.as_mutable(JSONIntKeyDict), default=dict
+    )
     total_questions: Mapped[int] = mapped_column(Integer, default=10)
     questions_asked: Mapped[int] = mapped_column(Integer, default=0)
 
-    def get_used_ids(self) -> list[int]:
-        return json.loads(self.used_question_ids_json or "[]")
-
-    def add_used_id(self, question_id: int) -> None:
-        ids = self.get_used_ids()
-        if question_id not in ids:
-            ids.append(question_id)
-        self.used_question_ids_json = json.dumps(ids)
-
-    def get_scores(self) -> dict[int, int]:
-        return {int(k): v for k, v in json.loads(self.score_json or "{}").items()}
-
-    def add_score(self, user_id: int, points: int = 1) -> None:
-        scores = self.get_scores()
-        scores[user_id] = scores.get(user_id, 0) + points
-        self.score_json = json.dumps(scores)
-
 
 class QuizUsedQuestion(Base):
     """Records that a question was used in a session (avoids repeats)."""
 
     __tablename__ = "quiz_used_questions"
+    # Serves the NOT EXISTS probe in get_next_question() and per-chat lookups.
+    # Not unique: existing databases may already hold duplicate rows, and two
+    # racing _send_question() calls may both record the same question.
+    __table_args__ = (
+        Index("ix_quq_chat_qid", "chat_id", "question_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    chat_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    chat_id: Mapped[int] = mapped_column(TelegramId, nullable=False)
     question_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("quiz_questions.id"), nullable=False
     )
@@ -9,18 +9,22 @@ Fixes applied in this file:
 """
 from __future__ import annotations
 
+import functools
 import itertools
-import json
 import logging
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any
 
 import aiohttp
 
 from app.config import settings
+from app.services.rag import format_rag_context, search_rag
+from app.utils.jsonfast import json_dumps, json_loads
 from app.utils.profanity import load_profanity, load_profanity_exceptions
-from app.utils.text import contains_profanity, split_profanity_words
+from app.utils.text import ProfanityMatcher, compile_keyword_trie
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +32,12 @@ logger = logging.getLogger(__name__)
 # Module-level profanity dictionaries (loaded once at import time)
 # ---------------------------------------------------------------------------
 _PROFANITY_ROOTS: list[str] = load_profanity()
-_PROFANITY_EXCEPTIONS: list[str] = load_profanity_exceptions()
+_PROFANITY_EXCEPTIONS: frozenset[str] = load_profanity_exceptions()
 
 # ---------------------------------------------------------------------------
 # Transliteration table for normalize_for_profanity()
 # ---------------------------------------------------------------------------
-_TRANSLIT_TABLE: list[tuple[str, str]] = [
+_TRANSLIT_TABLE: tuple[tuple[str, str], ...] = (
     # Full-word mappings first (longest possible matches)
     ("blyad", "бляд"),
     ("bljad", "бляд"),
@@ -100,7 +104,32 @@ _TRANSLIT_TABLE: list[tuple[str, str]] = [
     ("$", "с"),
     # ё→е normalisation in dictionary lookups
     ("ё", "е"),
-]
+)
+
+
+# Split the table once. Multi-char rules listed before the first single-char
+# rule run as one trie-shaped regex (longest match first); what follows keeps
+# its table order: "ph" as a plain replace, then a single str.translate pass.
+_FIRST_SINGLE = next(i for i, (src, _) in enumerate(_TRANSLIT_TABLE) if len(src) == 1)
+_TRANSLIT_MULTI: dict[str, str] = {
+    src: dst for src, dst in _TRANSLIT_TABLE[:_FIRST_SINGLE] if src != "ph"
+}
+_TRANSLIT_MULTI_RE = compile_keyword_trie(_TRANSLIT_MULTI, longest=True)
+_TRANSLIT_SINGLE = str.maketrans(
+    {src: dst for src, dst in _TRANSLIT_TABLE if len(src) == 1}
+)
+
+_NON_CYRILLIC_RE = re.compile(r"[^а-яё]")
+
+# Prefilter: any character that can start a transliteration rule. Plain
+# Cyrillic chat messages contain none of them and skip straight to stripping.
+_TRANSLIT_TRIGGER_RE = re.compile(
+    "[" + "".join(sorted({re.escape(src[0]) for src, _ in _TRANSLIT_TABLE})) + "]"
+)
+
+
+def _translit_multi(match: re.Match[str]) -> str:
+    return _TRANSLIT_MULTI[match.group(0)]
 
 
 def normalize_for_profanity(text: str) -> str:
@@ -117,11 +146,12 @@ def normalize_for_profanity(text: str) -> str:
     made. Now a full transliteration table handles common leet/translit tricks.
     """
     result = text.lower()
-    # Apply multi-char rules first (they are listed first in _TRANSLIT_TABLE)
-    for src, dst in _TRANSLIT_TABLE:
-        result = result.replace(src, dst)
+    if _TRANSLIT_TRIGGER_RE.search(result) is not None:
+        # Multi-char rules in one regex pass, then "ph", then single chars at once
+        result = _TRANSLIT_MULTI_RE.sub(_translit_multi, result)
+        result = result.replace("ph", "ф").translate(_TRANSLIT_SINGLE)
     # Remove remaining non-Cyrillic/non-letter characters
-    result = re.sub(r"[^а-яё]", "", result)
+    result = _NON_CYRILLIC_RE.sub("", result)
     return result
 
 
@@ -133,21 +163,34 @@ def normalize_for_profanity(text: str) -> str:
 _FALLBACK_ROOTS = ["хуй", "хуе", "пизд", "ебл", "сука", "блядь", "мудак"]
 
 
+def _build_profanity_matcher() -> ProfanityMatcher:
+    roots = _PROFANITY_ROOTS if _PROFANITY_ROOTS else _FALLBACK_ROOTS
+    return ProfanityMatcher(roots, _PROFANITY_EXCEPTIONS)
+
+
+_PROFANITY_MATCHER = _build_profanity_matcher()
+
+
+# Spam floods and reposts repeat the same text; the checks below are pure
+# functions of it, so repeats are answered from a bounded cache.
+_TEXT_CHECK_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=_TEXT_CHECK_CACHE_SIZE)
 def detect_profanity(text: str) -> bool:
     """Return True if *text* contains profanity.
 
     Fix (Task 2): now uses profanity.txt (loaded into _PROFANITY_ROOTS) in
     addition to the fallback hard-coded list, and applies full transliteration.
+    Roots are matched through the precompiled _PROFANITY_MATCHER.
     """
-    roots = _PROFANITY_ROOTS if _PROFANITY_ROOTS else _FALLBACK_ROOTS
-    exceptions = _PROFANITY_EXCEPTIONS
-
-    # Check both original and normalized forms
-    for variant in (text, normalize_for_profanity(text)):
-        words = split_profanity_words(variant)
-        if contains_profanity(words, roots, exceptions):
-            return True
-    return False
+    # Check both original and normalized forms; the matcher runs all roots in
+    # one regex pass, and the second pass is skipped when normalization did
+    # not change anything (a plain single Cyrillic word).
+    if _PROFANITY_MATCHER.search(text):
+        return True
+    normalized = normalize_for_profanity(text)
+    return normalized != text.lower() and _PROFANITY_MATCHER.search(normalized)
 
 
 # ---------------------------------------------------------------------------
@@ -156,9 +199,15 @@ def detect_profanity(text: str) -> bool:
 
 def reload_profanity_dicts() -> int:
     """Reload profanity.txt and exceptions from disk; return count of roots."""
-    global _PROFANITY_ROOTS, _PROFANITY_EXCEPTIONS
-    _PROFANITY_ROOTS = load_profanity()
-    _PROFANITY_EXCEPTIONS = load_profanity_exceptions()
+    global _PROFANITY_ROOTS, _PROFANITY_EXCEPTIONS, _PROFANITY_MATCHER
+    roots = load_profanity()
+    exceptions = load_profanity_exceptions()
+    # Unchanged files keep the compiled matcher and the verdict cache
+    if roots != _PROFANITY_ROOTS or exceptions != _PROFANITY_EXCEPTIONS:
+        _PROFANITY_ROOTS = roots
+        _PROFANITY_EXCEPTIONS = exceptions
+        _PROFANITY_MATCHER = _build_profanity_matcher()
+        detect_profanity.cache_clear()
     logger.info("Profanity dicts reloaded: %d roots, %d exceptions",
                 len(_PROFANITY_ROOTS), len(_PROFANITY_EXCEPTIONS))
     return len(_PROFANITY_ROOTS)
@@ -291,8 +340,23 @@ GREETING_WORDS = (
     "хола",
 )
 
+# Greetings are matched as whole words: one set lookup per token, plus a
+# small regex for the multi-word phrases. Substring matching used to fire on
+# "куда" (ку) or "хайп" (хай).
+_GREET_SINGLE = frozenset(w for w in GREETING_WORDS if " " not in w)
+_GREET_MULTI_RE = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(re.escape(w) for w in GREETING_WORDS if " " in w)
+    + r")(?!\w)"
+)
+_WORD_RE = re.compile(r"\w+")
+
+# Topic keyword sets are matched with one precompiled trie regex (single pass)
+_ALLOWED_TOPIC_RE = compile_keyword_trie(_ALLOWED_ASSISTANT_TOPICS)
+_FORBIDDEN_TOPIC_RE = compile_keyword_trie(_FORBIDDEN_ASSISTANT_TOPICS)
+
 # Carousel of fun replies when the bot is greeted
-_MENTION_REPLIES = itertools.cycle([
+_MENTION_REPLIES: tuple[str, ...] = (
     "Привет, сосед! 👋 Чем могу помочь по ЖК?",
     "О, меня упомянули! Я весь внимание 🤖",
     "Здравствуй! Спроси про шлагбаум или правила — отвечу. 😄",
@@ -301,11 +365,12 @@ _MENTION_REPLIES = itertools.cycle([
     "Йо! На связи, сосед. Что нужно узнать? 🙌",
     "Приветствую! Я тут как добрый сосед — всегда готов помочь 😊",
     "Здорово! Спрашивай — я знаю про наш ЖК почти всё! 🏡",
-])
+)
+_mention_reply_counter = itertools.count()
 
 # Diverse replies when user asks by username and bot doesn't know the answer.
 # Uses {username} placeholder for personalization.
-_UNKNOWN_ANSWER_REPLIES = [
+_UNKNOWN_ANSWER_REPLIES: tuple[str, ...] = (
     "{username}, хороший вопрос! К сожалению, у меня нет точного ответа. Попробуй спросить в чате у соседей или обратиться в УК 🏢",
     "Ой, {username}, тут я пас 😅 Но могу помочь с вопросами про шлагбаум, правила, парковку — спрашивай!",
     "{username}, признаюсь — не знаю ответа на этот вопрос. Зато отлично разбираюсь в правилах ЖК! Может, что-то по этой теме? 😊",
@@ -314,13 +379,13 @@ _UNKNOWN_ANSWER_REPLIES = [
     "Не уверен, что знаю ответ, {username}. Давай лучше спрошу у соседей в чате? А пока — могу рассказать про правила ЖК!",
     "{username}, такого в моей базе нет 🤔 Но я постоянно учусь! Попробуй задать вопрос иначе или спроси про жизнь в ЖК.",
     "Эх, {username}, поймал меня! Этого я не знаю. Но по вопросам ЖК — обращайся, тут я профи 💪",
-]
+)
 
 _unknown_reply_counter = itertools.count()
 
 
 def _next_mention_reply() -> str:
-    return next(_MENTION_REPLIES)
+    return _MENTION_REPLIES[next(_mention_reply_counter) % len(_MENTION_REPLIES)]
 
 
 def get_unknown_answer_reply(username: str | None = None) -> str:
@@ -334,42 +399,90 @@ def get_unknown_answer_reply(username: str | None = None) -> str:
     return _UNKNOWN_ANSWER_REPLIES[idx].format(username=display_name)
 
 
+# The *_lowered helpers take text that is already lowercased, so that
+# assistant_reply() lowercases the prompt once for all of its checks.
+
+@functools.lru_cache(maxsize=_TEXT_CHECK_CACHE_SIZE)
+def _is_greeting_lowered(lowered: str) -> bool:
+    if not _GREET_SINGLE.isdisjoint(_WORD_RE.findall(lowered)):
+        return True
+    return _GREET_MULTI_RE.search(lowered) is not None
+
+
+@functools.lru_cache(maxsize=_TEXT_CHECK_CACHE_SIZE)
+def _is_topic_allowed_lowered(lowered: str) -> bool:
+    return _ALLOWED_TOPIC_RE.search(lowered) is not None
+
+
+@functools.lru_cache(maxsize=_TEXT_CHECK_CACHE_SIZE)
+def _is_forbidden_topic_lowered(lowered: str) -> bool:
+    return _FORBIDDEN_TOPIC_RE.search(lowered) is not None
+
+
+# Prompt classes for assistant_reply(), in priority order
+_PROMPT_FORBIDDEN = "forbidden"
+_PROMPT_GREETING = "greeting"
+_PROMPT_ALLOWED = "allowed"
+_PROMPT_OTHER = "other"
+
+
+@functools.lru_cache(maxsize=_TEXT_CHECK_CACHE_SIZE)
+def _classify_prompt(lowered: str) -> str:
+    """Classify a lowered prompt, stopping at the first check that decides it."""
+    if _FORBIDDEN_TOPIC_RE.search(lowered) is not None:
+        return _PROMPT_FORBIDDEN
+    if _is_greeting_lowered(lowered):
+        return _PROMPT_GREETING
+    if _ALLOWED_TOPIC_RE.search(lowered) is not None:
+        return _PROMPT_ALLOWED
+    return _PROMPT_OTHER
+
+
 def is_greeting(text: str) -> bool:
-    """Return True if *text* contains a greeting word."""
-    lowered = text.lower()
-    return any(w in lowered for w in GREETING_WORDS)
+    """Return True if *text* contains a greeting word or phrase."""
+    return _is_greeting_lowered(text.lower())
 
 
 def is_assistant_topic_allowed(text: str) -> bool:
     """Return True if text is relevant to the residential complex."""
-    lowered = text.lower()
-    return any(kw in lowered for kw in _ALLOWED_ASSISTANT_TOPICS)
+    return _is_topic_allowed_lowered(text.lower())
 
 
 def is_forbidden_topic(text: str) -> bool:
     """Return True if text touches explicitly forbidden topics."""
-    lowered = text.lower()
-    return any(kw in lowered for kw in _FORBIDDEN_ASSISTANT_TOPICS)
+    return _is_forbidden_topic_lowered(text.lower())
 
 
 # ---------------------------------------------------------------------------
 # Bot-name mention filter helpers
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=32)
+def _bot_name_pattern(bot_names: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile one alternation regex matching any of *bot_names* as a word.
+
+    Longer names come first so that "алекс бот" is consumed whole instead of
+    only its trailing "бот" when the pattern is used for stripping. Names
+    that differ only in case collapse into one branch.
+    """
+    names = {name.casefold() for name in bot_names if name}
+    alternation = "|".join(
+        re.escape(name) for name in sorted(names, key=lambda n: (-len(n), n))
+    )
+    return re.compile(r"(?<![\w])(?:" + alternation + r")(?![\w])", re.IGNORECASE)
+
+
 def _is_bot_name_called(text: str, bot_names: list[str]) -> bool:
     """Return True if any of *bot_names* is mentioned in *text*.
 
     Fix (Task 3): the original code used rf'(?<!\\\\w)...' which in Python
     produced a literal backslash-w instead of a word-boundary assertion.
-    The fix uses a proper raw string with (?<![\\w]) boundaries.
+    The fix uses a proper raw string with (?<![\\w]) boundaries, compiled
+    once per distinct name list.
     """
-    text_lower = text.lower()
-    for name in bot_names:
-        # Correct word-boundary pattern using raw string
-        boundary_pattern = r"(?<![" + r"\w" + r"])" + re.escape(name.casefold()) + r"(?![" + r"\w" + r"])"
-        if re.search(boundary_pattern, text_lower):
-            return True
-    return False
+    if not bot_names:
+        return False
+    return _bot_name_pattern(tuple(bot_names)).search(text) is not None
 
 
 # ---------------------------------------------------------------------------
@@ -442,6 +555,40 @@ _ASSISTANT_SYSTEM_PROMPT = """\
 """
 
 
+# ---------------------------------------------------------------------------
+# Assistant reply cache
+# ---------------------------------------------------------------------------
+
+# Residents keep asking the same questions ("как открыть шлагбаум"); an LLM
+# answer is reused for identical stand-alone questions instead of paying for
+# another round trip. The key includes the model and the full system prompt,
+# so a knowledge-base change produces a fresh answer.
+_REPLY_CACHE_MAX = 512
+# (model, system prompt, question) -> (reply, expires_at)
+_reply_cache: OrderedDict[tuple[str, str, str], tuple[str, float]] = OrderedDict()
+
+
+def _get_cached_reply(key: tuple[str, str, str]) -> str | None:
+    entry = _reply_cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry[1]:
+        del _reply_cache[key]
+        return None
+    _reply_cache.move_to_end(key)
+    return entry[0]
+
+
+def _cache_reply(key: tuple[str, str, str], reply: str) -> None:
+    ttl = settings.ai_reply_cache_ttl_sec
+    if ttl <= 0:
+        return
+    _reply_cache[key] = (reply, time.monotonic() + ttl)
+    _reply_cache.move_to_end(key)
+    if len(_reply_cache) > _REPLY_CACHE_MAX:
+        _reply_cache.popitem(last=False)
+
+
 # ---------------------------------------------------------------------------
 # OpenRouter provider
 # ---------------------------------------------------------------------------
@@ -449,6 +596,13 @@ _ASSISTANT_SYSTEM_PROMPT = """\
 class OpenRouterProvider:
     """Async client for the OpenRouter AI API."""
 
+    # Connection pool shared by moderation and assistant calls
+    _POOL_LIMIT = 32
+    _DNS_CACHE_TTL = 300  # seconds
+    # aiohttp's default total timeout is 5 minutes; a stuck moderation call
+    # should fall back to the local check long before that.
+    _REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
     def __init__(self) -> None:
         self._base_url = settings.openrouter_base_url.rstrip("/")
         self._api_key = settings.openrouter_api_key
@@ -458,6 +612,28 @@ class OpenRouterProvider:
             "HTTP-Referer": "https://github.com/AlexBot",
             "X-Title": "AlexBot",
         }
+        # One pooled HTTP session per provider keeps TLS connections alive
+        # between calls; created lazily because it needs a running loop.
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                connector=aiohttp.TCPConnector(
+                    limit=self._POOL_LIMIT,
+                    ttl_dns_cache=self._DNS_CACHE_TTL,
+                ),
+                timeout=self._REQUEST_TIMEOUT,
+                json_serialize=json_dumps,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session (called on bot shutdown)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def _chat_completion(
         self,
@@ -476,10 +652,9 @@ class OpenRouterProvider:
             "max_tokens": max_tokens,
         }
         url = f"{self._base_url}/chat/completions"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=self._headers, json=payload) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
+        async with self._get_session().post(url, json=payload) as resp:
+            resp.raise_for_status()
+            data = json_loads(await resp.read())
 
         content = data["choices"][0]["message"]["content"]
         return content, data
@@ -505,7 +680,7 @@ class OpenRouterProvider:
                 max_tokens=200,
                 chat_id=chat_id,
             )
-            return json.loads(content)
+            return json_loads(content)
         except Exception as exc:
             logger.warning("OpenRouter moderation failed: %s; using local fallback", exc)
             return _local_moderation_fallback(text)
@@ -531,9 +706,11 @@ class OpenRouterProvider:
         doesn't know the answer.
         """
         safe_prompt = prompt.strip()
+        lowered = safe_prompt.lower()
+        kind = _classify_prompt(lowered)
 
         # 1. Check forbidden topics first
-        if is_forbidden_topic(safe_prompt):
+        if kind == _PROMPT_FORBIDDEN:
             return (
                 "Это за пределами моей компетенции. "
                 "По юридическим вопросам обратитесь к специалисту. "
@@ -541,30 +718,40 @@ class OpenRouterProvider:
             )
 
         # 2. Handle greetings — return carousel reply (no topic check needed)
-        if is_greeting(safe_prompt):
+        if kind == _PROMPT_GREETING:
             return _next_mention_reply()
 
         # 3. If off-topic — diverse personalized redirect
-        if not is_assistant_topic_allowed(safe_prompt):
+        if kind != _PROMPT_ALLOWED:
             return get_unknown_answer_reply(username)
 
         # 4. If AI is disabled, use local reply builder for ЖК topics
         if not self._api_key:
-            return build_local_assistant_reply(safe_prompt)
+            return _local_reply_lowered(lowered)
 
-        # 5. Build system prompt, optionally injecting RAG context
+        # 5. Build system prompt, optionally injecting RAG context. Settings
+        # are read once so the cache key and the request name the same model.
+        model = settings.ai_model
         system = _ASSISTANT_SYSTEM_PROMPT
         if settings.ai_feature_rag:
             try:
-                from app.services.rag import search_rag, format_rag_context
-                rag_results = search_rag(safe_prompt, top_k=3)
+                # search_rag() is case-insensitive; reuse the lowered prompt
+                rag_results = search_rag(lowered, top_k=3)
                 rag_text = format_rag_context(rag_results)
                 if rag_text:
                     system += f"\n\nБаза знаний ЖК:\n{rag_text}"
             except Exception as exc:
                 logger.warning("RAG search failed: %s", exc)
 
-        # 6. Call LLM
+        # 6. Reuse the answer to an identical question asked without context
+        cache_key = None
+        if not context:
+            cache_key = (model, system, " ".join(lowered.split()))
+            cached = _get_cached_reply(cache_key)
+            if cached is not None:
+                return cached
+
+        # 7. Call LLM
         messages: list[dict[str, str]] = [{"role": "system", "content": system}]
         if context:
             messages.extend(context)
@@ -572,17 +759,28 @@ class OpenRouterProvider:
 
         try:
             content, _ = await self._chat_completion(
-                messages, chat_id=chat_id
+                messages, model=model, chat_id=chat_id
             )
-            return content
         except Exception as exc:
             logger.error("OpenRouter assistant call failed: %s", exc)
-            return build_local_assistant_reply(safe_prompt)
+            return _local_reply_lowered(lowered)
+        if cache_key is not None:
+            _cache_reply(cache_key, content)
+        return content
+
+
+@functools.lru_cache(maxsize=1)
+def get_ai_provider() -> OpenRouterProvider:
+    """Return the process-wide provider shared by all handlers."""
+    return OpenRouterProvider()
 
 
 def build_local_assistant_reply(prompt: str) -> str:
     """Simple rule-based fallback reply when AI is unavailable."""
-    lowered = prompt.lower()
+    return _local_reply_lowered(prompt.lower())
+
+
+def _local_reply_lowered(lowered: str) -> str:
     if "шлагбаум" in lowered or "ворот" in lowered or "пропуск" in lowered:
         return "Шлагбаум работает по карточке доступа. За новой карточкой — к администратору. Гости звонят через домофон! 🚗"
     if "правил" in lowered:
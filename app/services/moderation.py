@@ -8,12 +8,16 @@ Fix: run_moderation() now implements a proper escalation matrix:
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import OrderedDict
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
 from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import ChatPermissions
 
-from app.services.ai_module import OpenRouterProvider, detect_profanity
+from app.services.ai_module import detect_profanity, get_ai_provider
 from app.utils.text import contains_forbidden_link
 
 if TYPE_CHECKING:
@@ -22,10 +26,53 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
-_ai = OpenRouterProvider()
+_ai = get_ai_provider()
+
+# Permissions applied by a severity-3 mute; built once and reused
+_NO_PERMISSIONS = ChatPermissions(
+    can_send_messages=False,
+    can_send_audios=False,
+    can_send_documents=False,
+    can_send_photos=False,
+    can_send_videos=False,
+    can_send_video_notes=False,
+    can_send_voice_notes=False,
+    can_send_polls=False,
+    can_send_other_messages=False,
+    can_add_web_page_previews=False,
+    can_change_info=False,
+    can_invite_users=False,
+    can_pin_messages=False,
+)
+
+# In-memory strike counter (reset on restart; good enough for MVP).
+# Bounded LRU so that every user ever seen does not stay resident forever.
+_STRIKE_COUNT_MAX = 100_000
+_strike_count: OrderedDict[tuple[int, int], int] = OrderedDict()  # (chat_id, user_id) -> strikes
+
+
+def _get_strikes(key: tuple[int, int]) -> int:
+    strikes = _strike_count.get(key, 0)
+    if strikes:
+        _strike_count.move_to_end(key)
+    return strikes
+
+
+def _add_strike(key: tuple[int, int]) -> None:
+    _strike_count[key] = _strike_count.get(key, 0) + 1
+    _strike_count.move_to_end(key)
+    if len(_strike_count) > _STRIKE_COUNT_MAX:
+        _strike_count.popitem(last=False)
+
+
+# Texts at least this long run their local checks in a worker thread; below
+# it the thread hop costs more than the scan itself.
+_OFFLOAD_MIN_LENGTH = 1024
 
-# In-memory strike counter (reset on restart; good enough for MVP)
-_strike_count: dict[tuple[int, int], int] = {}  # (chat_id, user_id) -> strikes
+
+def _local_checks(text: str, forum_chat_id: int) -> tuple[bool, bool]:
+    """Return (has_profanity, has_bad_link) for *text*."""
+    return detect_profanity(text), contains_forbidden_link(text, forum_chat_id)
 
 
 async def run_moderation(
@@ -41,13 +88,22 @@ async def run_moderation(
     text = message.text or message.caption or ""
     user_id = message.from_user.id if message.from_user else 0
 
+    # Start the AI verdict first so the request is in flight while long texts
+    # are checked locally; it is cancelled if a local rule decides the case.
+    ai_task = asyncio.create_task(_ai.moderate_message(text, chat_id=forum_chat_id))
+
     # --- Fast local checks ---
-    has_profanity = detect_profanity(text)
-    has_bad_link = contains_forbidden_link(text, forum_chat_id)
+    if len(text) >= _OFFLOAD_MIN_LENGTH:
+        has_profanity, has_bad_link = await asyncio.to_thread(
+            _local_checks, text, forum_chat_id
+        )
+    else:
+        has_profanity, has_bad_link = _local_checks(text, forum_chat_id)
 
     # --- AI verdict ---
     verdict: dict[str, Any] = {}
     if has_profanity or has_bad_link:
+        ai_task.cancel()
         verdict = {
             "violation_type": "profanity" if has_profanity else "forbidden_link",
             "severity": 3 if has_profanity else 2,
@@ -56,7 +112,7 @@ async def run_moderation(
         }
     else:
         try:
-            verdict = await _ai.moderate_message(text, chat_id=forum_chat_id)
+            verdict = await ai_task
         except Exception as exc:
             logger.warning("Moderation AI call failed: %s", exc)
             return False
@@ -66,7 +122,7 @@ async def run_moderation(
         return False
 
     key = (forum_chat_id, user_id)
-    strikes = _strike_count.get(key, 0)
+    strikes = _get_strikes(key)
 
     try:
         if severity == 1:
@@ -86,11 +142,10 @@ async def run_moderation(
             await message.delete()
             if strikes == 0:
                 # First offence → mute 24 h
-                from datetime import timedelta
                 await bot.restrict_chat_member(
                     forum_chat_id,
                     user_id,
-                    permissions=_no_permissions(),
+                    permissions=_NO_PERMISSIONS,
                     until_date=timedelta(hours=24),
                 )
                 await bot.send_message(
@@ -106,7 +161,7 @@ async def run_moderation(
                     "🚫 Пользователь забанен за повторное нарушение.",
                     message_thread_id=message.message_thread_id,
                 )
-            _strike_count[key] = strikes + 1
+            _add_strike(key)
 
     except TelegramBadRequest as exc:
         logger.warning("Moderation action failed: %s", exc)
@@ -114,21 +169,3 @@ async def run_moderation(
 
     return severity > 0
 
-
-def _no_permissions():
-    from aiogram.types import ChatPermissions
-    return ChatPermissions(
-        can_send_messages=False,
-        can_send_audios=False,
-        can_send_documents=False,
-        can_send_photos=False,
-        can_send_videos=False,
-        can_send_video_notes=False,
-        can_send_voice_notes=False,
-        can_send_polls=False,
-        can_send_other_messages=False,
-        can_add_web_page_previews=False,
-        can_change_info=False,
-        can_invite_users=False,
-        can_pin_messages=False,
-    )
@@ -6,19 +6,20 @@ Fixes applied in this file:
 - Task 7:  build_answer_hint() now shows the actual word count.
 - Task 10: QUIZ_BREAK_BETWEEN_QUESTIONS_SEC default reduced to 30 s (was 60).
            Both constants are now read from env via settings.
-- Task 4.1: Race-condition guard (_quiz_finishing set) prevents double-finish.
+- Task 4.1: Race-condition guard (per-chat _QuizState lock) prevents double-finish.
 - Task 4.3: local_quiz_answer_decision() uses strict single-word matching.
 """
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import re
 import unicodedata
 from datetime import datetime, timezone
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import delete, select
+from sqlalchemy import bindparam, delete, exists, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -40,69 +41,211 @@ QUIZ_TOTAL_QUESTIONS = 10
 # ---------------------------------------------------------------------------
 # Race-condition guard (Task 4.1)
 # ---------------------------------------------------------------------------
-# Set of (chat_id, topic_id) pairs that are currently being finalized.
-_quiz_finishing: set[tuple[int, int]] = set()
 
-# Pending asyncio task handles for timeout / break timers
-_timeout_tasks: dict[tuple[int, int], asyncio.Task] = {}
-_grace_tasks: dict[tuple[int, int], asyncio.Task] = {}
+class _QuizState:
+    """Everything kept in memory for one (chat_id, topic_id) quiz.
+
+    ``lock`` is held while the session is being finalized; the timer handles,
+    the question currently asked as ``(question_id, answer)`` (lets
+    handle_quiz_answer reject wrong answers without touching the DB) and the
+    id of the question already claimed by a correct answer (two correct
+    answers can both pass the DB check before the first one commits; only
+    the claimer scores) live alongside it, so each call does a single dict
+    lookup.
+    """
+
+    __slots__ = ("lock", "timeout_task", "grace_task", "current", "answered_id")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.timeout_task: Optional[asyncio.Task] = None
+        self.grace_task: Optional[asyncio.Task] = None
+        self.current: Optional[tuple[int, str]] = None
+        self.answered_id: Optional[int] = None
+
+    def is_idle(self) -> bool:
+        return (
+            not self.lock.locked()
+            and self.timeout_task is None
+            and self.grace_task is None
+            and self.current is None
+            and self.answered_id is None
+        )
+
+
+_quiz_states: dict[tuple[int, int], _QuizState] = {}
+
+
+def _state(key: tuple[int, int]) -> _QuizState:
+    state = _quiz_states.get(key)
+    if state is None:
+        state = _quiz_states.setdefault(key, _QuizState())
+    return state
+
+
+def _drop_state_if_idle(key: tuple[int, int], state: _QuizState) -> None:
+    # Keep the table bounded by the number of running quizzes
+    if state.is_idle() and _quiz_states.get(key) is state:
+        del _quiz_states[key]
 
 
 # ---------------------------------------------------------------------------
 # Text normalization helpers
 # ---------------------------------------------------------------------------
 
-def _normalize_text(text: str) -> str:
-    """Lowercase, strip diacritics, remove punctuation."""
+# NFKD splits й/ё into a base letter plus a combining mark; the marks must be
+# dropped, not turned into spaces, or "Чайковский" becomes two words.
+# NFKD (not NFC) is deliberate: it is what lets "ёлка" match "елка".
+_COMBINING_MARK_RE = re.compile(r"[\u0300-\u036f]")
+_WORD_RE = re.compile(r"\w+")
+
+
+def _fold_case_and_marks(text: str) -> str:
+    # Lowercase first, as before; folded letters compare equal, so answers
+    # that differ only in й/и, ё/е or accents match exactly
     text = text.lower()
-    text = unicodedata.normalize("NFKD", text)
-    text = re.sub(r"[^\w\s]", " ", text, flags=re.UNICODE)
-    text = re.sub(r"\s+", " ", text).strip()
+    if not text.isascii():  # ASCII has nothing to decompose
+        text = _COMBINING_MARK_RE.sub("", unicodedata.normalize("NFKD", text))
     return text
 
 
+def _normalize_text(text: str) -> str:
+    """Lowercase, strip diacritics, remove punctuation."""
+    return " ".join(_normalize_words(text))
+
+
 def _normalize_words(text: str) -> list[str]:
     """Return a list of normalized words from *text*."""
-    return [w for w in _normalize_text(text).split() if w]
+    # Runs of word characters are exactly what survives punctuation removal
+    # and whitespace splitting, so one findall replaces both passes.
+    return _WORD_RE.findall(_fold_case_and_marks(text))
+
+
+@functools.lru_cache(maxsize=64)
+def _correct_answer_words(
+    correct_answer: str,
+) -> tuple[tuple[str, ...], frozenset[str]]:
+    # Answer texts come from the question bank, so they repeat for every guess
+    # and hint; user input goes through _normalize_words uncached.
+    words = tuple(_normalize_words(correct_answer))
+    return words, frozenset(words)
 
 
-def _levenshtein(a: str, b: str) -> int:
-    """Compute Levenshtein distance between two strings."""
+def _py_levenshtein(a: str, b: str, *, score_cutoff: Optional[int] = None) -> int:
+    """Pure-Python Levenshtein distance, used when rapidfuzz is missing.
+
+    Like rapidfuzz, returns ``score_cutoff + 1`` once the distance is
+    known to exceed *score_cutoff*.
+    """
     if a == b:
         return 0
+    if score_cutoff is not None:
+        if abs(len(a) - len(b)) > score_cutoff:
+            return score_cutoff + 1
+        if score_cutoff == 1:
+            # The quiz only ever asks "one edit or not": no DP needed
+            return 1 if _one_edit_apart(a, b) else 2
+    distance = _myers_levenshtein(a, b)
+    if score_cutoff is not None and distance > score_cutoff:
+        return score_cutoff + 1
+    return distance
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """Return True if distinct *a* and *b* differ by exactly one edit.
+
+    Skips the common prefix, then compares the remaining tails (C-level
+    slice compares) for a substitution or a single insertion/deletion.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    for ca, cb in zip(a, b):
+        if ca != cb:
+            break
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _myers_levenshtein(a: str, b: str) -> int:
+    """Bit-parallel (Myers/Hyyrö) Levenshtein distance.
+
+    Each DP column of *a* is one Python int bit vector, so the loop runs
+    once per character of *b* instead of once per cell.
+    """
     if not a:
         return len(b)
     if not b:
         return len(a)
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a):
-        curr = [i + 1]
-        for j, cb in enumerate(b):
-            curr.append(min(prev[j] + (ca != cb), curr[j] + 1, prev[j + 1] + 1))
-        prev = curr
-    return prev[-1]
+    peq: dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+try:
+    from rapidfuzz.distance import Levenshtein as _RapidLevenshtein
+except ImportError:  # rapidfuzz is optional
+    _levenshtein = _py_levenshtein
+else:
+    # Bit-parallel C++ implementation; exits early past score_cutoff
+    _levenshtein = _RapidLevenshtein.distance
 
 
 # ---------------------------------------------------------------------------
 # Answer hint (Task 7)
 # ---------------------------------------------------------------------------
 
+_WORD_FORMS = ("слово", "слова", "слов")
+_LETTER_FORMS = ("буква", "буквы", "букв")
+
+
+def _plural(n: int, forms: tuple[str, str, str]) -> str:
+    """Pick the Russian form for *n*: 1 слово, 2-4 слова, 5-20 слов, 21 слово..."""
+    if 11 <= n % 100 <= 14:
+        return forms[2]
+    last = n % 10
+    if last == 1:
+        return forms[0]
+    if 2 <= last <= 4:
+        return forms[1]
+    return forms[2]
+
+
 def build_answer_hint(answer: str) -> str:
     """Return a useful hint about the answer format.
 
     Fix (Task 7): previously returned generic 'В ответе много слов' for
     multi-word answers. Now shows the actual word count and letter count for
-    single-word answers.
+    single-word answers, each with the matching plural form.
     """
-    words = _normalize_words(answer)
+    words, _ = _correct_answer_words(answer)
     count = len(words)
     if count == 0:
         return "Подсказка недоступна."
     if count == 1:
-        return f"Ответ: 1 слово ({len(answer.strip())} букв)."
-    if count == 2:
-        return "Ответ: 2 слова."
-    return f"Ответ: {count} слова(-ов)."
+        letters = len(answer.strip())
+        return f"Ответ: 1 слово ({letters} {_plural(letters, _LETTER_FORMS)})."
+    return f"Ответ: {count} {_plural(count, _WORD_FORMS)}."
 
 
 # ---------------------------------------------------------------------------
@@ -143,7 +286,7 @@ def local_quiz_answer_decision(correct_answer: str, user_answer: str) -> _Decisi
       that either exactly matches or has Levenshtein distance ≤ 1.
     - Multi-word answers still use overlap ratio ≥ 0.8.
     """
-    correct_words = _normalize_words(correct_answer)
+    correct_words, correct_set = _correct_answer_words(correct_answer)
     answer_words = _normalize_words(user_answer)
 
     if not correct_words:
@@ -158,16 +301,17 @@ def local_quiz_answer_decision(correct_answer: str, user_answer: str) -> _Decisi
         answer_word = answer_words[0]
         if correct_word == answer_word:
             return _correct_decision()
-        if _levenshtein(correct_word, answer_word) <= 1:
+        # Length prune: most wrong answers are rejected without a distance call
+        if abs(len(correct_word) - len(answer_word)) > 1:
+            return _wrong_decision()
+        if _levenshtein(correct_word, answer_word, score_cutoff=1) <= 1:
             return _close_decision()
         return _wrong_decision()
 
     # Multi-word: overlap ratio
-    correct_set = set(correct_words)
-    answer_set = set(answer_words)
-    if not answer_set:
+    if not answer_words:
         return _wrong_decision()
-    overlap = len(correct_set & answer_set)
+    overlap = len(correct_set.intersection(answer_words))
     ratio = overlap / len(correct_set)
     if ratio >= 1.0:
         return _correct_decision()
@@ -180,48 +324,58 @@ def local_quiz_answer_decision(correct_answer: str, user_answer: str) -> _Decisi
 # DB helpers
 # ---------------------------------------------------------------------------
 
+# Hot-path statements are built once; only the bound parameters change.
+_SELECT_ACTIVE_SESSION = select(QuizSession).where(
+    QuizSession.chat_id == bindparam("chat_id"),
+    QuizSession.topic_id == bindparam("topic_id"),
+    QuizSession.is_active.is_(True),
+)
+
+_SELECT_UNUSED_QUESTION = (
+    select(QuizQuestion)
+    .where(
+        ~exists().where(
+            QuizUsedQuestion.chat_id == bindparam("chat_id"),
+            QuizUsedQuestion.question_id == QuizQuestion.id,
+        )
+    )
+    .order_by(func.random())
+    .limit(1)
+)
+
+
 async def get_active_session(
     session: AsyncSession, chat_id: int, topic_id: int
 ) -> Optional[QuizSession]:
     result = await session.execute(
-        select(QuizSession).where(
-            QuizSession.chat_id == chat_id,
-            QuizSession.topic_id == topic_id,
-            QuizSession.is_active.is_(True),
-        )
+        _SELECT_ACTIVE_SESSION, {"chat_id": chat_id, "topic_id": topic_id}
     )
     return result.scalar_one_or_none()
 
 
 async def get_next_question(
-    session: AsyncSession, chat_id: int, used_ids: list[int]
+    session: AsyncSession, chat_id: int
 ) -> Optional[QuizQuestion]:
-    """Return a random question not yet used in this chat."""
-    stmt = select(QuizQuestion)
-    if used_ids:
-        stmt = stmt.where(QuizQuestion.id.not_in(used_ids))
-    # Also exclude globally used questions for this chat
-    globally_used = (
-        select(QuizUsedQuestion.question_id)
-        .where(QuizUsedQuestion.chat_id == chat_id)
-    )
-    stmt = stmt.where(QuizQuestion.id.not_in(globally_used))
-    result = await session.execute(stmt)
-    questions = result.scalars().all()
-    if not questions:
-        # All questions used globally — reset the used list
-        return None
-    import random
-    return random.choice(questions)
+    """Return a random question not yet used in this chat.
 
+    Filtering is an anti-join against quiz_used_questions (covered by the
+    ``(chat_id, question_id)`` index) and the random pick happens in SQL, so
+    only one row is ever loaded. Returns None once every question was used.
+    """
+    result = await session.execute(_SELECT_UNUSED_QUESTION, {"chat_id": chat_id})
+    return result.scalar_one_or_none()
 
-async def mark_question_used(
+
+def mark_question_used(
     session: AsyncSession, chat_id: int, question_id: int
 ) -> None:
-    """Record *question_id* as used in *chat_id*."""
-    record = QuizUsedQuestion(chat_id=chat_id, question_id=question_id)
-    session.add(record)
-    await session.flush()
+    """Record *question_id* as used in *chat_id*.
+
+    The row is only added to the session: the caller commits right after,
+    so it is written in the same flush as the quiz session update instead of
+    costing a round trip of its own.
+    """
+    session.add(QuizUsedQuestion(chat_id=chat_id, question_id=question_id))
 
 
 async def reset_used_questions(session: AsyncSession, chat_id: int) -> int:
@@ -249,6 +403,8 @@ async def start_quiz_session(
         topic_id=topic_id,
         is_active=True,
         total_questions=QUIZ_TOTAL_QUESTIONS,
+        used_question_ids=[],
+        scores={},
     )
     session.add(quiz_session)
     await session.flush()
@@ -269,6 +425,7 @@ async def end_quiz_session(
     questions were asked, and quiz_questions rows must NEVER be deleted here.
     """
     quiz_session.is_active = False
+    quiz_session.current_question = None
     quiz_session.current_question_id = None
     quiz_session.ended_at = datetime.now(timezone.utc)
     # DO NOT delete from quiz_questions — they are needed for future sessions.
@@ -280,6 +437,44 @@ async def end_quiz_session(
 # Race-condition guard (Task 4.1)
 # ---------------------------------------------------------------------------
 
+def remember_current_question(
+    chat_id: int, topic_id: int, question_id: int, answer: str
+) -> tuple[int, str]:
+    entry = (question_id, answer)
+    _state((chat_id, topic_id)).current = entry
+    return entry
+
+
+def get_current_question(chat_id: int, topic_id: int) -> Optional[tuple[int, str]]:
+    """Return the cached ``(question_id, answer)`` or None if not cached."""
+    state = _quiz_states.get((chat_id, topic_id))
+    return state.current if state is not None else None
+
+
+def forget_current_question(chat_id: int, topic_id: int) -> None:
+    key = (chat_id, topic_id)
+    state = _quiz_states.get(key)
+    if state is not None:
+        state.current = None
+        _drop_state_if_idle(key, state)
+
+
+def claim_correct_answer(chat_id: int, topic_id: int, question_id: int) -> bool:
+    """Return True only for the first correct answer to *question_id*."""
+    state = _state((chat_id, topic_id))
+    if state.answered_id == question_id:
+        return False
+    state.answered_id = question_id
+    return True
+
+
+def release_correct_answer(chat_id: int, topic_id: int, question_id: int) -> None:
+    """Drop the claim on *question_id* so the next correct answer can score."""
+    state = _quiz_states.get((chat_id, topic_id))
+    if state is not None and state.answered_id == question_id:
+        state.answered_id = None
+
+
 async def safe_finish_quiz(
     session: AsyncSession,
     bot: "Bot",
@@ -292,59 +487,90 @@ async def safe_finish_quiz(
 
     Fix (Task 4.1): Both _handle_timeout() and _finalize_answers_after_grace()
     could try to finish the same session simultaneously. This function ensures
-    only one coroutine proceeds.
+    only one coroutine proceeds; the others return instead of finishing twice.
     """
     key = (chat_id, topic_id)
-    if key in _quiz_finishing:
+    state = _state(key)
+    if state.lock.locked():
         return  # Another coroutine is already finishing this session
-    _quiz_finishing.add(key)
-    try:
-        await end_quiz_session(session, quiz_session)
-        await session.commit()
-        await notify_callback(bot, chat_id, topic_id, quiz_session)
-    except Exception:
-        logger.exception("Error finishing quiz session (%d, %d)", chat_id, topic_id)
-        await session.rollback()
-    finally:
-        _quiz_finishing.discard(key)
+    async with state.lock:
+        try:
+            await end_quiz_session(session, quiz_session)
+            await session.commit()
+            await notify_callback(bot, chat_id, topic_id, quiz_session)
+        except Exception:
+            logger.exception(
+                "Error finishing quiz session (%d, %d)", chat_id, topic_id
+            )
+            await session.rollback()
+        finally:
+            state.answered_id = None
+            state.current = None
+    _drop_state_if_idle(key, state)
 
 
 # ---------------------------------------------------------------------------
 # Timer management
 # ---------------------------------------------------------------------------
 
+def _cancel_task(task: Optional[asyncio.Task]) -> None:
+    # A timer that schedules its successor must not cancel itself
+    if task and not task.done() and task is not asyncio.current_task():
+        task.cancel()
+
+
+def _track_task(key: tuple[int, int], slot: str, coro) -> asyncio.Task:
+    state = _state(key)
+    _cancel_task(getattr(state, slot))
+    task = asyncio.create_task(coro)
+    setattr(state, slot, task)
+
+    def _forget(done: asyncio.Task) -> None:
+        # Drop finished timers so their frames are released right away
+        if getattr(state, slot) is done:
+            setattr(state, slot, None)
+            _drop_state_if_idle(key, state)
+
+    task.add_done_callback(_forget)
+    return task
+
+
 def cancel_timeout(chat_id: int, topic_id: int) -> None:
     key = (chat_id, topic_id)
-    task = _timeout_tasks.pop(key, None)
-    if task and not task.done():
-        task.cancel()
+    state = _quiz_states.get(key)
+    if state is not None:
+        task, state.timeout_task = state.timeout_task, None
+        _cancel_task(task)
+        _drop_state_if_idle(key, state)
 
 
 def cancel_grace(chat_id: int, topic_id: int) -> None:
     key = (chat_id, topic_id)
-    task = _grace_tasks.pop(key, None)
-    if task and not task.done():
-        task.cancel()
+    state = _quiz_states.get(key)
+    if state is not None:
+        task, state.grace_task = state.grace_task, None
+        _cancel_task(task)
+        _drop_state_if_idle(key, state)
 
 
 def schedule_timeout(
     chat_id: int, topic_id: int, coro
 ) -> asyncio.Task:
-    cancel_timeout(chat_id, topic_id)
-    task = asyncio.create_task(coro)
-    _timeout_tasks[(chat_id, topic_id)] = task
-    return task
+    return _track_task((chat_id, topic_id), "timeout_task", coro)
 
 
 def schedule_grace(
     chat_id: int, topic_id: int, coro
 ) -> asyncio.Task:
-    cancel_grace(chat_id, topic_id)
-    task = asyncio.create_task(coro)
-    _grace_tasks[(chat_id, topic_id)] = task
-    return task
+    return _track_task((chat_id, topic_id), "grace_task", coro)
 
 
 def cancel_all_timers(chat_id: int, topic_id: int) -> None:
-    cancel_timeout(chat_id, topic_id)
-    cancel_grace(chat_id, topic_id)
+    key = (chat_id, topic_id)
+    state = _quiz_states.get(key)
+    if state is not None:
+        timeout_task, grace_task = state.timeout_task, state.grace_task
+        state.timeout_task = state.grace_task = None
+        _cancel_task(timeout_task)
+        _cancel_task(grace_task)
+        _drop_state_if_idle(key, state)
@@ -5,20 +5,23 @@ requiring ChromaDB or FAISS. Uses keyword overlap for retrieval.
 
 Architecture:
 - Knowledge stored in app/data/rag_knowledge.json
-- Loaded fresh on each search (file is small, ≤ a few hundred KB)
+- Parsed and tokenized once per file version (mtime + size), not per search
 - Updated via /updaterag (admin command) which fetches pinned messages from
   the forum chat
-- search_rag() uses TF-IDF-style word overlap to rank fragments
+- search_rag() uses TF-IDF-style word overlap to rank fragments, scoring
+  only the entries an inverted token index links to the query
 """
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import re
+from collections import Counter
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from app.config import settings
+from app.utils.jsonfast import json_dumps_pretty, json_loads
 
 if TYPE_CHECKING:
     from aiogram import Bot
@@ -27,6 +30,9 @@ logger = logging.getLogger(__name__)
 
 _RAG_FILE = Path(__file__).parent.parent / "data" / "rag_knowledge.json"
 
+_TOKEN_RE = re.compile(r"[а-яёa-z]+")
+_KEYWORD_TOKEN_RE = re.compile(r"[а-яёa-z]{4,}")
+
 
 # ---------------------------------------------------------------------------
 # Data structure
@@ -47,8 +53,7 @@ def _load_knowledge() -> list[RagEntry]:
     if not _RAG_FILE.exists():
         return []
     try:
-        with _RAG_FILE.open(encoding="utf-8") as fh:
-            return json.load(fh)
+        return json_loads(_RAG_FILE.read_bytes())
     except Exception as exc:
         logger.warning("Failed to load RAG knowledge: %s", exc)
         return []
@@ -56,13 +61,14 @@ def _load_knowledge() -> list[RagEntry]:
 
 def _save_knowledge(entries: list[RagEntry]) -> None:
     _RAG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with _RAG_FILE.open("w", encoding="utf-8") as fh:
-        json.dump(entries, fh, ensure_ascii=False, indent=2)
+    _RAG_FILE.write_bytes(json_dumps_pretty(entries))
+    # Don't rely on mtime resolution to notice our own write
+    _indexed_knowledge.cache_clear()
 
 
 def _tokenize(text: str) -> set[str]:
     """Return a set of lowercase word tokens (≥ 3 chars)."""
-    return {w for w in re.findall(r"[а-яёa-z]+", text.lower()) if len(w) >= 3}
+    return {w for w in _TOKEN_RE.findall(text.lower()) if len(w) >= 3}
 
 
 # ---------------------------------------------------------------------------
@@ -103,21 +109,37 @@ def _expand_with_synonyms(tokens: set[str]) -> set[str]:
     return expanded
 
 
-def _score(query_tokens: set[str], entry: RagEntry) -> float:
-    """Compute overlap score between query tokens and entry keywords + text.
+def _entry_tokens(entry: RagEntry) -> frozenset[str]:
+    """Return the tokens of an entry's text and keywords."""
+    tokens = _tokenize(entry.get("text", ""))
+    for kw in entry.get("keywords", []):
+        tokens.update(_tokenize(kw))
+    return frozenset(tokens)
+
+
+# Entries in file order plus an inverted index: token -> entry positions
+_KnowledgeIndex = tuple[tuple[RagEntry, ...], dict[str, list[int]]]
+
+
+@functools.lru_cache(maxsize=1)
+def _indexed_knowledge(path: str, mtime_ns: int, size: int) -> _KnowledgeIndex:
+    """Load the knowledge base and index every entry once per file version.
 
-    Uses synonym expansion on the query side to improve recall for
-    colloquial/short questions.
+    The arguments only key the cache; _load_knowledge() reads _RAG_FILE.
     """
-    expanded_query = _expand_with_synonyms(query_tokens)
-    entry_tokens = _tokenize(entry.get("text", ""))
-    for kw in entry.get("keywords", []):
-        entry_tokens.update(_tokenize(kw))
-    if not entry_tokens:
-        return 0.0
-    intersection = expanded_query & entry_tokens
-    # Normalize by original query size to keep scoring fair
-    return len(intersection) / len(query_tokens) if query_tokens else 0.0
+    entries = tuple(_load_knowledge())
+    index: dict[str, list[int]] = {}
+    for position, entry in enumerate(entries):
+        for token in _entry_tokens(entry):
+            index.setdefault(token, []).append(position)
+    return entries, index
+
+
+def _load_indexed_knowledge() -> _KnowledgeIndex:
+    if not _RAG_FILE.exists():
+        return (), {}
+    stat = _RAG_FILE.stat()
+    return _indexed_knowledge(str(_RAG_FILE), stat.st_mtime_ns, stat.st_size)
 
 
 # ---------------------------------------------------------------------------
@@ -126,17 +148,24 @@ def _score(query_tokens: set[str], entry: RagEntry) -> float:
 
 def search_rag(query: str, top_k: int = 3) -> list[RagEntry]:
     """Return top-k most relevant knowledge-base entries for *query*."""
-    knowledge = _load_knowledge()
-    if not knowledge:
+    entries, index = _load_indexed_knowledge()
+    if not entries:
         return []
 
     query_tokens = _tokenize(query)
     if not query_tokens:
         return []
 
-    scored = [(entry, _score(query_tokens, entry)) for entry in knowledge]
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return [entry for entry, score in scored[:top_k] if score > 0.0]
+    # Overlap |expanded query ∩ entry tokens| for every entry sharing a token;
+    # entries outside the postings lists would score 0 and are never touched.
+    overlap: Counter[int] = Counter()
+    for token in _expand_with_synonyms(query_tokens):
+        overlap.update(index.get(token, ()))
+
+    # Score is overlap / len(query_tokens), so ranking by overlap is the same;
+    # ties keep file order as before.
+    ranked = sorted(overlap.items(), key=lambda item: (-item[1], item[0]))
+    return [entries[position] for position, _ in ranked[:top_k]]
 
 
 def format_rag_context(results: list[RagEntry]) -> str:
@@ -206,7 +235,7 @@ def add_rag_entry(entry_id: str, source: str, text: str) -> None:
 
 def _extract_keywords(text: str) -> list[str]:
     """Extract significant words from *text* as keyword candidates."""
-    tokens = re.findall(r"[а-яёa-z]{4,}", text.lower())
+    tokens = _KEYWORD_TOKEN_RE.findall(text.lower())
     # Deduplicate while preserving order
     seen: set[str] = set()
     result: list[str] = []
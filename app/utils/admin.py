@@ -3,23 +3,68 @@
 Fix (Task 6): Previously is_admin() made a live Telegram API call on EVERY
 message, which causes rate-limit problems at 100+ msg/min. Now results are
 cached for ADMIN_CACHE_TTL_MIN minutes.
+
+The moderation path checks every forum message, so it uses a per-chat set of
+admin ids (one getChatAdministrators call per chat per TTL) instead of one
+getChatMember call per user.
 """
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable, Optional
 
 from app.config import settings
 
 if TYPE_CHECKING:
     from aiogram import Bot
 
-# (chat_id, user_id) -> (is_admin_result, cached_at)
-_ADMIN_CACHE: dict[tuple[int, int], tuple[bool, datetime]] = {}
+# Entries store a time.monotonic() deadline: it is cheaper than building an
+# aware datetime on every message and does not jump with the wall clock.
+# Insertion order is expiry order (the TTL is the same for every entry), so
+# expired entries are swept from the front and the size stays bounded.
+_ADMIN_CACHE_MAX = 10_000
+
+# (chat_id, user_id) -> (is_admin_result, expires_at)
+_ADMIN_CACHE: OrderedDict[tuple[int, int], tuple[bool, float]] = OrderedDict()
+
+# chat_id -> (admin user ids, expires_at)
+_ADMIN_IDS_CACHE: dict[int, tuple[frozenset[int], float]] = {}
+
+
+# In-flight API calls by cache key. A burst of messages that all miss the
+# cache shares one request instead of each making its own.
+_PENDING: dict[Hashable, asyncio.Future] = {}
+
+
+async def _single_flight(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    task = _PENDING.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _PENDING[key] = task
+
+        def _forget(done: asyncio.Future) -> None:
+            if _PENDING.get(key) is done:
+                del _PENDING[key]
+
+        task.add_done_callback(_forget)
+    # A cancelled waiter must not cancel the request the others wait for
+    return await asyncio.shield(task)
+
+
+def _cache_ttl() -> float:
+    return settings.admin_cache_ttl_min * 60.0
 
 
-def _cache_ttl() -> timedelta:
-    return timedelta(minutes=settings.admin_cache_ttl_min)
+def _remember_admin(key: tuple[int, int], result: bool, now: float) -> None:
+    _ADMIN_CACHE.pop(key, None)
+    _ADMIN_CACHE[key] = (result, now + _cache_ttl())
+    while _ADMIN_CACHE:
+        oldest = next(iter(_ADMIN_CACHE.values()))
+        if oldest[1] > now and len(_ADMIN_CACHE) <= _ADMIN_CACHE_MAX:
+            break
+        _ADMIN_CACHE.popitem(last=False)
 
 
 async def is_admin(bot: "Bot", chat_id: int, user_id: int) -> bool:
@@ -28,28 +73,65 @@ async def is_admin(bot: "Bot", chat_id: int, user_id: int) -> bool:
     Results are cached for ``settings.admin_cache_ttl_min`` minutes to avoid
     hammering the Telegram API.
     """
+    cached = is_admin_cached(chat_id, user_id)
+    if cached is not None:
+        return cached
+
     key = (chat_id, user_id)
-    now = datetime.now(timezone.utc)
+    now = time.monotonic()
+
+    entry = _ADMIN_CACHE.get(key)
+    if entry is not None and now < entry[1]:
+        return entry[0]
+
+    async def fetch() -> bool:
+        member = await bot.get_chat_member(chat_id, user_id)
+        result = member.status in {"administrator", "creator"}
+        _remember_admin(key, result, time.monotonic())
+        return result
+
+    return await _single_flight(("member", key), fetch)
+
+
+async def get_admin_ids(bot: "Bot", chat_id: int) -> frozenset[int]:
+    """Return the ids of all admins/creators of *chat_id*.
+
+    The whole set is fetched with one API call and cached per chat for
+    ``settings.admin_cache_ttl_min`` minutes.
+    """
+    now = time.monotonic()
+    cached = _ADMIN_IDS_CACHE.get(chat_id)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+
+    async def fetch() -> frozenset[int]:
+        admins = await bot.get_chat_administrators(chat_id)
+        admin_ids = frozenset(member.user.id for member in admins)
+        _ADMIN_IDS_CACHE[chat_id] = (admin_ids, time.monotonic() + _cache_ttl())
+        return admin_ids
+
+    return await _single_flight(("admins", chat_id), fetch)
 
-    if key in _ADMIN_CACHE:
-        result, cached_at = _ADMIN_CACHE[key]
-        if now - cached_at < _cache_ttl():
-            return result
 
-    member = await bot.get_chat_member(chat_id, user_id)
-    result = member.status in {"administrator", "creator"}
-    _ADMIN_CACHE[key] = (result, now)
-    return result
+def is_admin_cached(chat_id: int, user_id: int) -> Optional[bool]:
+    """Answer from the per-chat admin set without I/O; None if not cached."""
+    cached = _ADMIN_IDS_CACHE.get(chat_id)
+    if cached is None or time.monotonic() >= cached[1]:
+        return None
+    return user_id in cached[0]
 
 
 def invalidate_admin_cache(chat_id: int, user_id: int) -> None:
     """Remove a single entry from the admin cache.
 
     Call this after /mute, /ban, /unban so the next check fetches fresh data.
+    The chat's admin set is dropped as well, since membership changed.
     """
     _ADMIN_CACHE.pop((chat_id, user_id), None)
+    _ADMIN_IDS_CACHE.pop(chat_id, None)
 
 
 def clear_admin_cache() -> None:
     """Flush the entire admin cache (useful in tests)."""
     _ADMIN_CACHE.clear()
+    _ADMIN_IDS_CACHE.clear()
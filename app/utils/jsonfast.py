@@ -0,0 +1,29 @@
+"""JSON helpers that use orjson when it is installed."""
+from __future__ import annotations
+
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib
+    import json
+
+    def json_dumps(value: Any) -> str:
+        return json.dumps(value)
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def json_dumps_pretty(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+else:
+
+    def json_dumps(value: Any) -> str:
+        # Score dicts have int keys, which orjson rejects without this option
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    json_loads = orjson.loads
+
+    def json_dumps_pretty(value: Any) -> bytes:
+        # Human-editable data files: two-space indent, UTF-8 kept as is
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2)
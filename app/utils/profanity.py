@@ -1,7 +1,7 @@
 """Utilities for loading profanity word lists from disk."""
 from __future__ import annotations
 
-import os
+import functools
 from pathlib import Path
 
 _DATA_DIR = Path(__file__).parent.parent / "data"
@@ -9,23 +9,31 @@ _PROFANITY_FILE = _DATA_DIR / "profanity.txt"
 _EXCEPTIONS_FILE = _DATA_DIR / "profanity_exceptions.txt"
 
 
-def _load_lines(path: Path) -> list[str]:
-    if not path.exists():
-        return []
+@functools.lru_cache(maxsize=4)
+def _read_lines(path: Path, mtime_ns: int, size: int) -> tuple[str, ...]:
+    # mtime_ns/size only key the cache: an edited file is read again
     words: list[str] = []
     with path.open(encoding="utf-8") as fh:
         for line in fh:
             line = line.strip()
             if line and not line.startswith("#"):
                 words.append(line.lower())
-    return words
+    return tuple(words)
+
+
+def _load_lines(path: Path) -> tuple[str, ...]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return ()
+    return _read_lines(path, stat.st_mtime_ns, stat.st_size)
 
 
 def load_profanity() -> list[str]:
-    """Return all profanity roots/words from profanity.txt."""
-    return _load_lines(_PROFANITY_FILE)
+    """Return all profanity roots/words from profanity.txt (deduplicated, file order)."""
+    return list(dict.fromkeys(_load_lines(_PROFANITY_FILE)))
 
 
-def load_profanity_exceptions() -> list[str]:
-    """Return all exception words that must not be flagged."""
-    return _load_lines(_EXCEPTIONS_FILE)
+def load_profanity_exceptions() -> frozenset[str]:
+    """Return the set of exception words that must not be flagged."""
+    return frozenset(_load_lines(_EXCEPTIONS_FILE))
@@ -1,8 +1,9 @@
 """Text analysis and link detection utilities."""
 from __future__ import annotations
 
+import functools
 import re
-from typing import Sequence
+from typing import Iterable, Sequence
 
 
 # Matches http(s)/www URLs and bare t.me links
@@ -14,8 +15,10 @@ LINK_PATTERN = re.compile(
     r"|t\.me/[^\s]+",
     re.IGNORECASE,
 )
+_URL_SCHEMES = ("https://", "http://")
 
 
+@functools.lru_cache(maxsize=8)
 def _forum_link_prefix(forum_chat_id: int) -> str:
     """Build the t.me/c/XXXXX/ prefix for the bot's own forum."""
     cid = str(abs(forum_chat_id))
@@ -32,37 +35,101 @@ def contains_forbidden_link(text: str, forum_chat_id: int = 0) -> bool:
     Fix (Task 5): Previously ALL t.me/ links were blocked, including
     legitimate /help links to forum topics. Now internal forum links pass.
     """
-    matches = LINK_PATTERN.findall(text)
-    if not matches:
+    # Every link contains one of these substrings, and most messages have no
+    # link at all: plain substring tests are much cheaper than the regex.
+    lowered = text.lower()
+    if "http" not in lowered and "www." not in lowered and "t.me/" not in lowered:
         return False
-
-    allowed_prefix = _forum_link_prefix(forum_chat_id) if forum_chat_id else None
-
-    for match in matches:
-        match_lower = match.lower()
-        if allowed_prefix:
-            # Strip protocol prefix so both 'https://t.me/c/...' and 't.me/c/...' match
-            stripped = re.sub(r"^https?://", "", match_lower)
-            if stripped.startswith(allowed_prefix):
-                # Link to own forum topic — OK
-                continue
+    if not forum_chat_id:
+        return LINK_PATTERN.search(text) is not None
+
+    allowed_prefix = _forum_link_prefix(forum_chat_id)
+    # finditer stops at the first external link instead of collecting all
+    for found in LINK_PATTERN.finditer(text):
+        match_lower = found.group().lower()
+        # Strip protocol prefix so both 'https://t.me/c/...' and 't.me/c/...' match
+        stripped = (
+            match_lower.partition("://")[2]
+            if match_lower.startswith(_URL_SCHEMES)
+            else match_lower
+        )
+        if stripped.startswith(allowed_prefix):
+            # Link to own forum topic — OK
+            continue
         return True
     return False
 
 
+# ---------------------------------------------------------------------------
+# Keyword matching
+# ---------------------------------------------------------------------------
+
+def _keyword_trie_source(keywords: Iterable[str], *, shortest: bool) -> str:
+    """Return trie-shaped regex source matching any of *keywords* ("" if none).
+
+    With *shortest* the branch stops where the first keyword ends, which is
+    all a substring test needs. Otherwise longer keywords are tried first and
+    the shorter one is kept as a fallback, so a following lookahead (e.g. a
+    word boundary) can still select the keyword that fits.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def _build(node: dict[str, dict]) -> str:
+        ends_here = "" in node
+        # A keyword ending here already matches; longer ones add nothing
+        if ends_here and shortest:
+            return ""
+        branches = [
+            re.escape(char) + _build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if ends_here:
+            branches.append("")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return _build(trie) if trie else ""
+
+
+def compile_keyword_trie(keywords: Iterable[str], *, longest: bool = False) -> re.Pattern[str]:
+    """Compile *keywords* into one trie-shaped regex for substring search.
+
+    ``pattern.search(text)`` is truthy exactly when ``any(kw in text ...)``
+    would be, but the text is scanned once and each position branches on a
+    single character instead of trying every keyword in turn.
+
+    With *longest* each match is the longest keyword at its position, as a
+    longest-first alternation would give (needed for ``sub``/``finditer``).
+    """
+    source = _keyword_trie_source(keywords, shortest=not longest)
+    if not source:
+        return re.compile(r"(?!)")  # never matches
+    return re.compile(source)
+
+
 # ---------------------------------------------------------------------------
 # Profanity helpers used by ai_module.detect_profanity()
 # ---------------------------------------------------------------------------
 
+_WORD_CHARS = "[а-яёa-z]"
+_WORD_START = "(?<!" + _WORD_CHARS + ")"
+_WORD_END = "(?!" + _WORD_CHARS + ")"
+_WORD_RE = re.compile(_WORD_CHARS + "+")
+
+
 def split_profanity_words(text: str) -> list[str]:
     """Tokenise text into lowercase words (letters only)."""
-    return re.findall(r"[а-яёa-z]+", text.lower())
+    return _WORD_RE.findall(text.lower())
 
 
 def contains_profanity(
     words: Sequence[str],
     profanity_roots: Sequence[str],
-    exceptions: Sequence[str],
+    exceptions: Iterable[str],
 ) -> bool:
     """Return True if any word matches a profanity root and is not an exception.
 
@@ -70,15 +137,60 @@ def contains_profanity(
     - ``word.startswith(root)`` — word begins with the root (e.g. 'хуйня' matches 'хуй')
     - ``root.startswith(word) and len(word) >= 4`` — word is a truncated translit form
       (e.g. normalized 'бляд' matches stored root 'блядь')
+
+    *words* are letter-only tokens from split_profanity_words(). The check
+    runs through a ProfanityMatcher compiled once per dictionary, so it is a
+    single scan instead of a words x roots loop.
     """
-    exc_set = set(exceptions)
-    for word in words:
-        if word in exc_set:
-            continue
-        for root in profanity_roots:
-            if word.startswith(root):
-                return True
-            # Reverse: translit may produce an incomplete form of the stored root
-            if len(word) >= 4 and root.startswith(word):
+    exc_set = exceptions if isinstance(exceptions, frozenset) else frozenset(exceptions)
+    return _cached_matcher(tuple(profanity_roots), exc_set).contains(words)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_matcher(roots: tuple[str, ...], exceptions: frozenset[str]) -> ProfanityMatcher:
+    return ProfanityMatcher(roots, exceptions)
+
+
+class ProfanityMatcher:
+    """Precompiled form of :func:`contains_profanity` for a fixed dictionary.
+
+    Forward matches (word starts with a root) and reverse matches (word is a
+    truncated root of 4+ letters) are fused into one word-anchored trie
+    regex, so :meth:`search` tokenises and matches a text in a single scan
+    and the cost no longer grows with the number of roots. Rebuild the
+    matcher whenever the dictionaries change.
+    """
+
+    __slots__ = ("_words_re", "_exceptions")
+
+    def __init__(self, profanity_roots: Iterable[str], exceptions: Iterable[str]) -> None:
+        roots = [root for root in profanity_roots if root]
+        root_prefixes = {root[:end] for root in roots for end in range(4, len(root) + 1)}
+        branches = []
+        if roots:
+            # Word starting with a root: consume the rest of the word
+            branches.append(_keyword_trie_source(roots, shortest=True) + _WORD_CHARS + "*")
+        if root_prefixes:
+            # Whole word that is a truncated root
+            branches.append(
+                _keyword_trie_source(root_prefixes, shortest=False) + _WORD_END
+            )
+        self._words_re = (
+            re.compile(_WORD_START + "(?:" + "|".join(branches) + ")") if branches else None
+        )
+        self._exceptions = (
+            exceptions if isinstance(exceptions, frozenset) else frozenset(exceptions)
+        )
+
+    def search(self, text: str) -> bool:
+        """Return True if *text* has a profane word; same rules as contains_profanity()."""
+        if self._words_re is None:
+            return False
+        for match in self._words_re.finditer(text.lower()):
+            if match.group() not in self._exceptions:
                 return True
-    return False
+        return False
+
+    def contains(self, words: Iterable[str]) -> bool:
+        """Return True if any of already split *words* is profane."""
+        return self.search(" ".join(words))
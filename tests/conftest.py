@@ -1,23 +1,33 @@
 """Shared pytest fixtures."""
 from __future__ import annotations
 
-import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+from app.models import quiz as _quiz_models  # noqa: F401  (registers tables)
+from app.models.base import Base
 
 
 @pytest.fixture
 def mock_bot():
     bot = AsyncMock()
     bot.get_me = AsyncMock(return_value=MagicMock(username="alexbot", id=123456))
+    bot.me = bot.get_me
     bot.get_chat_member = AsyncMock(
         return_value=MagicMock(status="member")
     )
     return bot
+
+
+@pytest.fixture
+async def db_sessionmaker():
+    """Session factory bound to a fresh in-memory SQLite database."""
+    # StaticPool: every session shares the one connection that holds the DB
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
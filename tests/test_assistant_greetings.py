@@ -52,6 +52,13 @@ class TestBotNameCalled:
     def test_case_insensitive(self):
         assert _is_bot_name_called("ALEXBOT помоги", ["alexbot"]) is True
 
+    def test_pattern_compiled_once_per_name_list(self):
+        from app.services.ai_module import _bot_name_pattern
+
+        names = ("AlexBot", "alexbot", "бот")
+        assert _bot_name_pattern(names) is _bot_name_pattern(names)
+        assert _bot_name_pattern(names).pattern.count("alexbot") == 1
+
 
 # ---------------------------------------------------------------------------
 # Task 4 — greetings get fun reply, not refusal
@@ -76,6 +83,46 @@ class TestIsGreeting:
     def test_not_greeting_offtopic(self):
         assert is_greeting("расскажи анекдот") is False
 
+    def test_multi_word_greeting(self):
+        assert is_greeting("Добрый вечер, соседи") is True
+
+    def test_short_greeting_not_matched_inside_word(self):
+        assert is_greeting("куда поставить машину?") is False
+
+
+class TestClassifyPrompt:
+    def test_priority_forbidden_greeting_allowed(self):
+        from app.services.ai_module import _classify_prompt
+
+        assert _classify_prompt("привет, нужен адвокат по суду") == "forbidden"
+        assert _classify_prompt("привет, как открыть шлагбаум") == "greeting"
+        assert _classify_prompt("как открыть шлагбаум") == "allowed"
+        assert _classify_prompt("расскажи анекдот") == "other"
+
+
+class TestCompileKeywordTrie:
+    def test_matches_like_substring_any(self):
+        from app.utils.text import compile_keyword_trie
+
+        keywords = ("ук ", "здравствуй", "здравствуйте", "сосед", "суд")
+        pattern = compile_keyword_trie(keywords)
+        samples = (
+            "здравствуйте, соседи",
+            "позвоню в ук завтра",
+            "звоню в ук",
+            "судак на ужин",
+            "просто текст",
+            "",
+        )
+        for text in samples:
+            expected = any(kw in text for kw in keywords)
+            assert (pattern.search(text) is not None) is expected, text
+
+    def test_empty_keyword_set_never_matches(self):
+        from app.utils.text import compile_keyword_trie
+
+        assert compile_keyword_trie(()).search("что угодно") is None
+
 
 class TestAssistantReplyGreetings:
     @pytest.mark.asyncio
@@ -85,8 +132,8 @@ class TestAssistantReplyGreetings:
         # No API key → falls through local logic
         provider._api_key = ""
 
-        # Patch is_greeting to ensure True (belt-and-suspenders)
-        with patch("app.services.ai_module.is_greeting", return_value=True):
+        # Patch the prompt class to greeting (belt-and-suspenders)
+        with patch("app.services.ai_module._classify_prompt", return_value="greeting"):
             with patch("app.services.ai_module._next_mention_reply", return_value="Привет! 👋"):
                 reply = await provider.assistant_reply("привет бот")
 
@@ -101,10 +148,8 @@ class TestAssistantReplyGreetings:
         provider = OpenRouterProvider()
         provider._api_key = ""
 
-        with patch("app.services.ai_module.is_greeting", return_value=False):
-            with patch("app.services.ai_module.is_forbidden_topic", return_value=False):
-                with patch("app.services.ai_module.is_assistant_topic_allowed", return_value=False):
-                    reply = await provider.assistant_reply("расскажи анекдот")
+        with patch("app.services.ai_module._classify_prompt", return_value="other"):
+            reply = await provider.assistant_reply("расскажи анекдот")
 
         # Should contain a soft redirect, not a hard refusal
         assert reply  # not empty
@@ -118,7 +163,7 @@ class TestAssistantReplyGreetings:
         provider = OpenRouterProvider()
         provider._api_key = ""
 
-        with patch("app.services.ai_module.is_forbidden_topic", return_value=True):
+        with patch("app.services.ai_module._classify_prompt", return_value="forbidden"):
             reply = await provider.assistant_reply("мне нужен адвокат по суду")
 
         assert reply
@@ -166,6 +211,21 @@ class TestRagIntegration:
         assert len(results) >= 1
         assert any("шлагбаум" in r["text"].lower() for r in results)
 
+    def test_search_rag_parses_file_once_per_version(self, tmp_path):
+        from app.services import rag
+
+        rag_file = tmp_path / "rag_knowledge.json"
+        with patch("app.services.rag._RAG_FILE", rag_file):
+            add_rag_entry("lift", "manual", "Лифт обслуживают по понедельникам.")
+            with patch("app.services.rag._load_knowledge", wraps=rag._load_knowledge) as load:
+                assert search_rag("когда обслуживают лифт")
+                assert search_rag("лифт сломался")
+                assert load.call_count == 1
+
+            add_rag_entry("trash", "manual", "Мусор вывозят ежедневно утром.")
+            results = search_rag("когда вывозят мусор")
+        assert [r["id"] for r in results] == ["trash"]
+
     def test_format_rag_context_empty(self):
         assert format_rag_context([]) == ""
 
@@ -208,19 +268,130 @@ class TestRagIntegration:
                 mock_settings.ai_feature_rag = True
                 mock_settings.openrouter_base_url = "https://example.com"
                 mock_settings.ai_model = "gpt-4"
+                mock_settings.ai_reply_cache_ttl_sec = 0
                 mock_settings.quiz_timeout_sec = 60
                 mock_settings.quiz_break_sec = 30
                 mock_settings.admin_cache_ttl_min = 5
 
-                # Patch is_assistant_topic_allowed to return True for шлагбаум
-                with patch("app.services.ai_module.is_assistant_topic_allowed", return_value=True):
-                    with patch("app.services.ai_module.is_greeting", return_value=False):
-                        with patch("app.services.ai_module.is_forbidden_topic", return_value=False):
-                            with patch("app.services.ai_module.settings", mock_settings):
-                                await provider.assistant_reply("как открыть шлагбаум")
+                # Patch the prompt class to an allowed ЖК topic for шлагбаум
+                with patch("app.services.ai_module._classify_prompt", return_value="allowed"):
+                    with patch("app.services.ai_module.settings", mock_settings):
+                        await provider.assistant_reply("как открыть шлагбаум")
 
         # Check that at least one message contains RAG context
         system_content = next(
             (m["content"] for m in captured_messages if m.get("role") == "system"), ""
         )
         assert "Шлагбаум работает" in system_content or len(captured_messages) > 0
+
+
+# ---------------------------------------------------------------------------
+# Assistant reply cache
+# ---------------------------------------------------------------------------
+
+class TestAssistantReplyCache:
+    @pytest.mark.asyncio
+    async def test_repeated_question_served_from_cache(self):
+        from app.services import ai_module
+
+        ai_module._reply_cache.clear()
+        calls = []
+
+        async def fake_chat_completion(messages, **kwargs):
+            calls.append(messages)
+            return "Ответ про шлагбаум.", {}
+
+        provider = OpenRouterProvider()
+        provider._api_key = "fake-key"
+        provider._chat_completion = fake_chat_completion
+
+        with patch("app.services.ai_module._classify_prompt", return_value="allowed"):
+            first = await provider.assistant_reply("Как открыть шлагбаум?")
+            second = await provider.assistant_reply("как  открыть шлагбаум?")
+            await provider.assistant_reply(
+                "как открыть шлагбаум?",
+                context=[{"role": "user", "content": "я с третьего подъезда"}],
+            )
+
+        assert first == second == "Ответ про шлагбаум."
+        # The context-bound question still goes to the model
+        assert len(calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# OpenRouter provider — pooled HTTP session
+# ---------------------------------------------------------------------------
+
+class TestOpenRouterSession:
+    @pytest.mark.asyncio
+    async def test_chat_completion_reuses_session(self):
+        from aioresponses import aioresponses
+
+        provider = OpenRouterProvider()
+        url = f"{provider._base_url}/chat/completions"
+        body = {"choices": [{"message": {"content": "ok"}}]}
+        try:
+            with aioresponses() as mocked:
+                mocked.post(url, payload=body, repeat=True)
+                await provider._chat_completion([{"role": "user", "content": "1"}])
+                first = provider._session
+                content, _ = await provider._chat_completion(
+                    [{"role": "user", "content": "2"}]
+                )
+            assert content == "ok"
+            assert provider._session is first
+        finally:
+            await provider.close()
+        assert provider._session is None
+
+
+# ---------------------------------------------------------------------------
+# Mention filter — getMe is cached, not repeated per message
+# ---------------------------------------------------------------------------
+
+class TestBotMentionedFilter:
+    @pytest.mark.asyncio
+    async def test_plain_messages_fetch_get_me_at_most_once(self):
+        from aiogram import Bot
+        from app.handlers import help as help_handler
+
+        bot = Bot(token="123456:TEST")
+        get_me = AsyncMock(return_value=MagicMock(username="alexbot_jk"))
+        message = MagicMock()
+        message.text = "Когда починят лифт?"
+        message.chat.id = help_handler.settings.forum_chat_id
+
+        with patch.object(bot, "get_me", get_me):
+            for _ in range(3):
+                assert await help_handler._bot_mentioned(message, bot) is False
+        assert get_me.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_mention_passes_pattern_to_handler(self, mock_bot):
+        from app.handlers import help as help_handler
+
+        message = MagicMock()
+        message.text = "алекс бот, как открыть шлагбаум?"
+        message.chat.id = help_handler.settings.forum_chat_id
+
+        result = await help_handler._bot_mentioned(message, mock_bot)
+        assert result
+        stripped = result["bot_name_pattern"].sub("", message.text).strip(" ,!?")
+        assert stripped == "как открыть шлагбаум"
+
+    @pytest.mark.asyncio
+    async def test_username_mention_is_case_insensitive(self):
+        from aiogram import Bot
+        from app.handlers import help as help_handler
+
+        bot = Bot(token="123456:TEST")
+        message = MagicMock()
+        message.text = "alexjkbot, где контейнеры?"
+        message.chat.id = help_handler.settings.forum_chat_id
+
+        get_me = AsyncMock(return_value=MagicMock(username="AlexJKBot"))
+        with patch.object(bot, "get_me", get_me):
+            result = await help_handler._bot_mentioned(message, bot)
+        assert result
+        stripped = result["bot_name_pattern"].sub("", message.text).strip(" ,!?")
+        assert stripped == "где контейнеры"
@@ -8,8 +8,8 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.services.ai_module import detect_profanity, normalize_for_profanity
-from app.utils.text import contains_forbidden_link
-from app.utils.admin import clear_admin_cache, is_admin
+from app.utils.text import ProfanityMatcher, contains_forbidden_link, contains_profanity
+from app.utils.admin import clear_admin_cache, get_admin_ids, is_admin
 
 
 # ---------------------------------------------------------------------------
@@ -78,6 +78,84 @@ class TestNormalizeForProfanity:
         assert "е" in result  # ё→е
 
 
+class TestDetectProfanityCache:
+    def test_reload_clears_cached_verdicts(self):
+        from app.services import ai_module
+
+        assert detect_profanity("кабачок") is False
+        try:
+            with patch.object(ai_module, "load_profanity", return_value=["кабач"]):
+                ai_module.reload_profanity_dicts()
+            assert detect_profanity("кабачок") is True
+        finally:
+            ai_module.reload_profanity_dicts()
+        assert detect_profanity("кабачок") is False
+
+    def test_reload_keeps_matcher_when_files_unchanged(self):
+        from app.services import ai_module
+
+        matcher = ai_module._PROFANITY_MATCHER
+        ai_module.reload_profanity_dicts()
+        assert ai_module._PROFANITY_MATCHER is matcher
+
+
+class TestProfanityFileCache:
+    def test_file_read_again_only_after_change(self, tmp_path):
+        import os
+        from app.utils import profanity
+
+        path = tmp_path / "words.txt"
+        path.write_text("# comment\nАБВ\n", encoding="utf-8")
+        assert profanity._load_lines(path) == ("абв",)
+        with patch("pathlib.Path.open", side_effect=AssertionError("re-read")):
+            assert profanity._load_lines(path) == ("абв",)
+
+        path.write_text("АБВ\nгде\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert profanity._load_lines(path) == ("абв", "где")
+
+    def test_missing_file_is_empty(self, tmp_path):
+        from app.utils import profanity
+
+        assert profanity._load_lines(tmp_path / "missing.txt") == ()
+
+
+class TestProfanityMatcher:
+    ROOTS = ["хуй", "пизд", "блядь", "мудак"]
+    EXCEPTIONS = ["хуйнямуйня"]
+
+    EXPECTED = {
+        "хуйня": True,        # starts with a root
+        "пиздец": True,
+        "мудаки": True,
+        "бляд": True,         # truncated root, 4+ letters
+        "муда": True,
+        "бля": False,         # truncated root, too short
+        "пиз": False,
+        "хуйнямуйня": False,  # exception
+        "хлеб": False,
+        "": False,
+    }
+
+    def test_word_rules(self):
+        matcher = ProfanityMatcher(self.ROOTS, self.EXCEPTIONS)
+        for word, expected in self.EXPECTED.items():
+            assert matcher.contains([word]) is expected, word
+            assert contains_profanity([word], self.ROOTS, self.EXCEPTIONS) is expected, word
+
+    def test_search_scans_raw_text(self):
+        matcher = ProfanityMatcher(self.ROOTS, self.EXCEPTIONS)
+        assert matcher.search("Ну ты и МУДАК, сосед") is True
+        assert matcher.search("хуйнямуйня, а не лифт") is False
+        assert matcher.search("хуйнямуйня и пиздец") is True
+        assert matcher.search("подхуйный") is False  # root only at word start
+
+    def test_empty_dictionary_matches_nothing(self):
+        assert ProfanityMatcher([], []).contains(["хуй"]) is False
+        assert ProfanityMatcher([], []).search("хуй") is False
+
+
 # ---------------------------------------------------------------------------
 # Link filter (Task 5)
 # ---------------------------------------------------------------------------
@@ -97,6 +175,10 @@ class TestContainsForbiddenLink:
         own_link = "t.me/c/1234567890/42"
         assert contains_forbidden_link(own_link, self.FORUM_CHAT_ID) is False
 
+    def test_uppercase_link_blocked(self):
+        assert contains_forbidden_link("WWW.SPAM.COM", self.FORUM_CHAT_ID) is True
+        assert contains_forbidden_link("HTTPS://Spam.com", self.FORUM_CHAT_ID) is True
+
     def test_own_forum_link_with_https_allowed(self):
         own_link = "https://t.me/c/1234567890/99"
         assert contains_forbidden_link(own_link, self.FORUM_CHAT_ID) is False
@@ -152,3 +234,136 @@ class TestAdminCache:
             return_value=MagicMock(status="creator")
         )
         assert await _is_admin(bot, -100100, 1) is True
+
+    @pytest.mark.asyncio
+    async def test_admin_ids_fetched_once_per_chat(self):
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_administrators = AsyncMock(
+            return_value=[MagicMock(user=MagicMock(id=1)), MagicMock(user=MagicMock(id=2))]
+        )
+        assert 1 in await get_admin_ids(bot, -100100)
+        assert 42 not in await get_admin_ids(bot, -100100)
+        assert bot.get_chat_administrators.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_is_admin_uses_cached_admin_set(self):
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_administrators = AsyncMock(
+            return_value=[MagicMock(user=MagicMock(id=1))]
+        )
+        await get_admin_ids(bot, -100100)
+        assert await is_admin(bot, -100100, 1) is True
+        assert await is_admin(bot, -100100, 99) is False
+        bot.get_chat_member.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_refetched(self):
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_member = AsyncMock(return_value=MagicMock(status="member"))
+        with patch("app.utils.admin.settings") as mock_settings:
+            mock_settings.admin_cache_ttl_min = 0
+            await is_admin(bot, -100100, 99)
+            await is_admin(bot, -100100, 99)
+        assert bot.get_chat_member.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self):
+        import asyncio
+
+        clear_admin_cache()
+        bot = AsyncMock()
+
+        async def get_chat_administrators(chat_id):
+            await asyncio.sleep(0)
+            return [MagicMock(user=MagicMock(id=1))]
+
+        bot.get_chat_administrators = AsyncMock(side_effect=get_chat_administrators)
+        results = await asyncio.gather(*(get_admin_ids(bot, -100100) for _ in range(5)))
+        assert all(1 in ids for ids in results)
+        assert bot.get_chat_administrators.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_size_bounded(self):
+        from app.utils import admin
+
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_member = AsyncMock(return_value=MagicMock(status="member"))
+        with patch.object(admin, "_ADMIN_CACHE_MAX", 3):
+            for user_id in range(10):
+                await is_admin(bot, -100100, user_id)
+        assert list(admin._ADMIN_CACHE) == [(-100100, 7), (-100100, 8), (-100100, 9)]
+
+
+# ---------------------------------------------------------------------------
+# Strike counter
+# ---------------------------------------------------------------------------
+
+class TestStrikeCount:
+    def test_evicts_least_recently_seen_user(self):
+        from app.services import moderation
+
+        with patch.object(moderation, "_STRIKE_COUNT_MAX", 2), \
+                patch.object(moderation, "_strike_count", moderation.OrderedDict()):
+            moderation._add_strike((1, 10))
+            moderation._add_strike((1, 20))
+            assert moderation._get_strikes((1, 10)) == 1  # refreshes user 10
+            moderation._add_strike((1, 30))
+            assert moderation._get_strikes((1, 20)) == 0
+            assert moderation._get_strikes((1, 10)) == 1
+            assert moderation._get_strikes((1, 30)) == 1
+
+
+class TestRunModerationAiVerdict:
+    @staticmethod
+    def _message(text: str) -> MagicMock:
+        message = MagicMock()
+        message.text = text
+        message.caption = None
+        message.from_user.id = 42
+        message.message_thread_id = None
+        message.delete = AsyncMock()
+        message.reply = AsyncMock()
+        return message
+
+    @pytest.mark.asyncio
+    async def test_local_hit_cancels_ai_call(self):
+        from app.services import moderation
+
+        moderate = AsyncMock(return_value={"severity": 0})
+        bot = MagicMock(restrict_chat_member=AsyncMock(), send_message=AsyncMock(),
+                        ban_chat_member=AsyncMock())
+        with patch.object(moderation._ai, "moderate_message", moderate), \
+                patch.object(moderation, "_strike_count", moderation.OrderedDict()):
+            acted = await moderation.run_moderation(self._message("хуй"), bot, -100)
+        assert acted is True
+        moderate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_clean_text_uses_ai_verdict(self):
+        from app.services import moderation
+
+        moderate = AsyncMock(return_value={"severity": 1})
+        message = self._message("Когда починят лифт?")
+        with patch.object(moderation._ai, "moderate_message", moderate):
+            acted = await moderation.run_moderation(message, MagicMock(), -100)
+        assert acted is True
+        moderate.assert_awaited_once()
+        message.reply.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_long_text_checked_off_loop(self):
+        from app.services import moderation
+
+        moderate = AsyncMock(return_value={"severity": 0})
+        text = "Когда починят лифт? " * 60
+        with patch.object(moderation._ai, "moderate_message", moderate), \
+                patch.object(moderation.asyncio, "to_thread",
+                             AsyncMock(return_value=(False, False))) as to_thread:
+            acted = await moderation.run_moderation(self._message(text), MagicMock(), -100)
+        assert acted is False
+        to_thread.assert_awaited_once_with(moderation._local_checks, text, -100)
+        moderate.assert_awaited_once()
@@ -14,9 +14,13 @@ from datetime import datetime, timezone
 
 from app.services.quiz import (
     build_answer_hint,
+    claim_correct_answer,
     end_quiz_session,
     local_quiz_answer_decision,
+    remember_current_question,
+    safe_finish_quiz,
 )
+from app.services import quiz as quiz_svc
 
 
 # ---------------------------------------------------------------------------
@@ -92,6 +96,16 @@ class TestBuildAnswerHint:
         assert "3" in hint
         assert "много слов" not in hint.lower()
 
+    def test_plural_forms(self):
+        assert "5 слов." in build_answer_hint("раз два три четыре пять")
+        assert "(3 буквы)" in build_answer_hint("Нил")
+        assert "(6 букв)" in build_answer_hint("Москва")
+        assert "(21 буква)" in build_answer_hint("а" * 21)
+
+    def test_letter_with_diacritic_does_not_split_word(self):
+        assert "1 слово" in build_answer_hint("Чайковский")
+        assert "1 слово" in build_answer_hint("Ёлка")
+
     def test_empty_answer(self):
         hint = build_answer_hint("")
         assert "недоступна" in hint.lower() or hint  # graceful
@@ -126,6 +140,28 @@ class TestLocalQuizAnswerDecision:
         decision = local_quiz_answer_decision("Нил", "Волга")
         assert decision.is_correct is False
 
+    def test_single_word_two_edits_rejected(self):
+        assert local_quiz_answer_decision("Нил", "Нилов").is_correct is False
+        assert local_quiz_answer_decision("Пушкин", "Пушкни").is_correct is False
+
+    def test_single_word_substitution_close(self):
+        decision = local_quiz_answer_decision("Пушкин", "Пушкен")
+        assert decision.is_correct is True
+        assert decision.is_close is True
+
+    def test_yo_matches_ye(self):
+        assert local_quiz_answer_decision("ёлка", "Елка").is_correct
+
+    def test_diacritics_fold_to_exact_match(self):
+        decision = local_quiz_answer_decision("Чайковский", "ЧАИКОВСКИИ")
+        assert decision.is_correct is True
+        assert decision.is_close is False
+        assert local_quiz_answer_decision("Café", "cafe").is_close is False
+
+    def test_normalize_text_drops_marks_and_punctuation(self):
+        assert quiz_svc._normalize_text("Ёжик, Чайковский!") == "ежик чаиковскии"
+        assert quiz_svc._normalize_text("Hello,  World") == "hello world"
+
     def test_multiword_correct_full_overlap(self):
         decision = local_quiz_answer_decision("Лев Толстой", "Лев Толстой")
         assert decision.is_correct is True
@@ -142,3 +178,274 @@ class TestLocalQuizAnswerDecision:
     def test_case_insensitive(self):
         decision = local_quiz_answer_decision("МОСКВА", "москва")
         assert decision.is_correct is True
+
+
+# ---------------------------------------------------------------------------
+# Pure-Python Levenshtein fallback agrees with rapidfuzz
+# ---------------------------------------------------------------------------
+
+_LEVENSHTEIN_PAIRS = [
+    ("", ""),
+    ("", "нил"),
+    ("нил", ""),
+    ("нил", "нил"),
+    ("нил", "нила"),
+    ("нила", "нил"),
+    ("пушкин", "пушкен"),
+    ("пушкин", "пушкни"),
+    ("нил", "нилов"),
+    ("kitten", "sitting"),
+    ("flaw", "lawn"),
+    ("абв", "вба"),
+    ("a" * 70, "a" * 69 + "b"),
+    ("достоевский", "толстой"),
+]
+
+
+class TestPyLevenshtein:
+    @pytest.mark.parametrize("a, b", _LEVENSHTEIN_PAIRS)
+    @pytest.mark.parametrize("score_cutoff", [None, 0, 1, 2, 5])
+    def test_matches_rapidfuzz(self, a, b, score_cutoff):
+        rapid = pytest.importorskip("rapidfuzz.distance").Levenshtein
+        assert quiz_svc._py_levenshtein(a, b, score_cutoff=score_cutoff) == (
+            rapid.distance(a, b, score_cutoff=score_cutoff)
+        )
+
+    @pytest.mark.parametrize("a, b, expected", [
+        ("нил", "нила", True),
+        ("нила", "нил", True),
+        ("нил", "ил", True),
+        ("пушкин", "пушкен", True),
+        ("пушкин", "ушкин", True),
+        ("пушкин", "пушкни", False),
+        ("нил", "лин", False),
+        ("аб", "ба", False),
+        ("", "а", True),
+    ])
+    def test_one_edit_apart(self, a, b, expected):
+        """Called only for distinct strings whose lengths differ by at most one."""
+        assert quiz_svc._one_edit_apart(a, b) is expected
+
+
+# ---------------------------------------------------------------------------
+# Only the first correct answer to a question scores
+# ---------------------------------------------------------------------------
+
+class TestClaimCorrectAnswer:
+    def test_first_claim_wins(self):
+        assert claim_correct_answer(-100500, 2, 7) is True
+        assert claim_correct_answer(-100500, 2, 7) is False
+
+    def test_next_question_can_be_claimed(self):
+        assert claim_correct_answer(-100501, 2, 7) is True
+        assert claim_correct_answer(-100501, 2, 8) is True
+
+    def test_topics_are_independent(self):
+        assert claim_correct_answer(-100502, 2, 7) is True
+        assert claim_correct_answer(-100502, 3, 7) is True
+
+
+# ---------------------------------------------------------------------------
+# Task 4.1 — concurrent finishers end the session only once
+# ---------------------------------------------------------------------------
+
+class TestSafeFinishQuiz:
+    @pytest.mark.asyncio
+    async def test_concurrent_finish_runs_once(self):
+        import asyncio
+
+        session = MagicMock()
+        session.commit = AsyncMock()
+        session.flush = AsyncMock()
+        calls = []
+
+        async def notify(*args):
+            calls.append(args)
+            await asyncio.sleep(0)
+
+        quiz_session = MagicMock()
+        remember_current_question(-100600, 2, 7, "ответ")
+
+        await asyncio.gather(
+            safe_finish_quiz(session, MagicMock(), -100600, 2, quiz_session, notify),
+            safe_finish_quiz(session, MagicMock(), -100600, 2, quiz_session, notify),
+        )
+
+        assert len(calls) == 1
+        assert (-100600, 2) not in quiz_svc._quiz_states
+
+
+# ---------------------------------------------------------------------------
+# get_next_question only returns questions not yet used in the chat
+# ---------------------------------------------------------------------------
+
+class TestNextQuestionQuery:
+    @pytest.mark.asyncio
+    async def test_skips_used_questions_until_exhausted(self, db_sessionmaker):
+        from app.models.quiz import QuizQuestion, QuizUsedQuestion
+        from app.services.quiz import get_next_question
+
+        async with db_sessionmaker() as session:
+            questions = [QuizQuestion(question=f"q{i}", answer=f"a{i}") for i in range(5)]
+            session.add_all(questions)
+            await session.flush()
+            ids = {q.id for q in questions}
+            used = {questions[0].id, questions[1].id}
+            session.add_all(
+                [QuizUsedQuestion(chat_id=-100800, question_id=qid) for qid in used]
+                # Questions used in another chat stay available here
+                + [QuizUsedQuestion(chat_id=-100801, question_id=questions[2].id)]
+            )
+            await session.commit()
+
+            for _ in range(len(ids) - len(used)):
+                question = await get_next_question(session, -100800)
+                assert question is not None
+                assert question.id not in used
+                used.add(question.id)
+                session.add(QuizUsedQuestion(chat_id=-100800, question_id=question.id))
+                await session.commit()
+
+            assert used == ids
+            assert await get_next_question(session, -100800) is None
+
+
+# ---------------------------------------------------------------------------
+# A correct answer is committed before the break between questions
+# ---------------------------------------------------------------------------
+
+class TestScoreSurvivesStopDuringBreak:
+    CHAT_ID = -100700
+
+    @pytest.mark.asyncio
+    async def test_stop_during_break_keeps_point(self, db_sessionmaker):
+        from contextlib import asynccontextmanager
+
+        from app.handlers import quiz as quiz_handlers
+        from app.models.quiz import QuizQuestion
+        from app.utils.admin import clear_admin_cache
+
+        @asynccontextmanager
+        async def session_scope():
+            async with db_sessionmaker() as session:
+                yield session
+
+        async with db_sessionmaker() as session:
+            session.add_all(
+                [QuizQuestion(question=f"q{i}", answer="ответ") for i in range(3)]
+            )
+            await session.commit()
+
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_member = AsyncMock(return_value=MagicMock(status="creator"))
+
+        def message(user_id, text):
+            msg = MagicMock()
+            msg.chat.id = self.CHAT_ID
+            msg.message_thread_id = 2
+            msg.from_user.id = user_id
+            msg.text = text
+            msg.reply = AsyncMock()
+            return msg
+
+        async def stop_during_break(_delay):
+            await quiz_handlers.cmd_stop_quiz(message(1, "/stopquiz"), bot)
+
+        with patch.object(quiz_handlers, "session_scope", session_scope), \
+                patch.object(quiz_handlers.settings, "forum_chat_id", self.CHAT_ID), \
+                patch.object(quiz_handlers.settings, "topic_games", 2):
+            await quiz_handlers.cmd_start_quiz(message(1, "/startquiz"), bot)
+            with patch.object(quiz_handlers.asyncio, "sleep", stop_during_break):
+                await quiz_handlers.handle_quiz_answer(message(7, "ответ"), bot)
+            quiz_svc.cancel_all_timers(self.CHAT_ID, 2)
+
+        texts = [c.args[1] for c in bot.send_message.call_args_list]
+        assert any("1 очк." in text for text in texts)
+        # The stopped quiz is not revived by the question after the break
+        assert sum("❓" in text for text in texts) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_reply_releases_claim(self, db_sessionmaker):
+        from contextlib import asynccontextmanager
+
+        from app.handlers import quiz as quiz_handlers
+        from app.models.quiz import QuizQuestion
+        from app.utils.admin import clear_admin_cache
+
+        @asynccontextmanager
+        async def session_scope():
+            async with db_sessionmaker() as session:
+                yield session
+
+        async with db_sessionmaker() as session:
+            session.add_all(
+                [QuizQuestion(question=f"q{i}", answer="ответ") for i in range(3)]
+            )
+            await session.commit()
+
+        clear_admin_cache()
+        bot = AsyncMock()
+        bot.get_chat_member = AsyncMock(return_value=MagicMock(status="creator"))
+
+        def message(user_id, text):
+            msg = MagicMock()
+            msg.chat.id = self.CHAT_ID
+            msg.message_thread_id = 2
+            msg.from_user.id = user_id
+            msg.text = text
+            msg.reply = AsyncMock()
+            return msg
+
+        async def stop_during_break(_delay):
+            await quiz_handlers.cmd_stop_quiz(message(1, "/stopquiz"), bot)
+
+        failing = message(7, "ответ")
+        failing.reply.side_effect = RuntimeError("telegram is down")
+        with patch.object(quiz_handlers, "session_scope", session_scope), \
+                patch.object(quiz_handlers.settings, "forum_chat_id", self.CHAT_ID), \
+                patch.object(quiz_handlers.settings, "topic_games", 2):
+            await quiz_handlers.cmd_start_quiz(message(1, "/startquiz"), bot)
+            with pytest.raises(RuntimeError):
+                await quiz_handlers.handle_quiz_answer(failing, bot)
+            # The question is open again and still timed
+            assert quiz_svc.get_current_question(self.CHAT_ID, 2) is not None
+            assert quiz_svc._quiz_states[(self.CHAT_ID, 2)].timeout_task is not None
+            with patch.object(quiz_handlers.asyncio, "sleep", stop_during_break):
+                await quiz_handlers.handle_quiz_answer(message(8, "ответ"), bot)
+            quiz_svc.cancel_all_timers(self.CHAT_ID, 2)
+
+        texts = [c.args[1] for c in bot.send_message.call_args_list]
+        assert any("1 очк." in text for text in texts)
+
+
+# ---------------------------------------------------------------------------
+# Schema upgrade: indexes added to existing tables
+# ---------------------------------------------------------------------------
+
+class TestCreateSchema:
+    @pytest.mark.asyncio
+    async def test_index_added_to_existing_table(self):
+        from sqlalchemy import inspect, text
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        from app.models.base import _create_schema
+
+        engine = create_async_engine("sqlite+aiosqlite://")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(_create_schema)
+                # Simulate a database created before the index existed
+                await conn.execute(text("DROP INDEX ix_quq_chat_qid"))
+                await conn.execute(text(
+                    "INSERT INTO quiz_used_questions (chat_id, question_id) "
+                    "VALUES (1, 1), (1, 1)"
+                ))
+                await conn.run_sync(_create_schema)
+                indexes = await conn.run_sync(
+                    lambda sync_conn: inspect(sync_conn).get_indexes("quiz_used_questions")
+                )
+        finally:
+            await engine.dispose()
+
+        assert "ix_quq_chat_qid" in {index["name"] for index in indexes}